@@ -0,0 +1,287 @@
+"""Simulador de carga do Sistema de Gerenciamento de Produtos.
+
+Monta um catálogo sintético (IDs no formato "ABC-123", categorias de categorias_validas)
+e executa uma mistura configurável de operações (vendas, buscas, movimentações de
+estoque, descontos e relatórios) sobre as funções de operação de trabalho.py, por um
+número de operações ou por um tempo determinado. No final mostra a vazão sustentada,
+as latências (p50/p95/p99/máx.) de cada tipo de operação e o crescimento da memória.
+
+Exemplo:
+    python simulador_carga.py --produtos 20000 --operacoes 200000 --mix venda=70,busca=20,estoque=5,desconto=2,relatorio=3
+    python simulador_carga.py --duracao 30 --particionado categoria
+    python simulador_carga.py --particionado hash --lote 1   # uma operação por vez no roteador
+"""
+
+import argparse
+import datetime
+import random
+import string
+import time
+import tracemalloc
+
+import trabalho
+
+MIX_PADRAO = "venda=70,busca=20,estoque=5,desconto=2,relatorio=3"
+TIPOS_DE_OPERACAO = ['venda', 'busca', 'estoque', 'desconto', 'relatorio']
+AMOSTRAS_DE_MEMORIA = 10  # quantas medições de memória são feitas ao longo da simulação
+TAMANHO_LOTE_PADRAO = 64  # vendas/movimentações enviadas juntas ao roteador no modo particionado
+
+def gerar_id_sintetico(indice):
+    """
+    Gera o ID de número 'indice' no formato ABC-123 (até 26^3 x 1000 IDs diferentes)
+    """
+    letras, numero = divmod(indice, 1000)
+    primeira, resto = divmod(letras, 26 * 26)
+    segunda, terceira = divmod(resto, 26)
+    return (f"{string.ascii_uppercase[primeira]}{string.ascii_uppercase[segunda]}"
+            f"{string.ascii_uppercase[terceira]}-{numero:03d}")
+
+def montar_catalogo_sintetico(quantidade_produtos, gerador):
+    """
+    Cadastra produtos sintéticos válidos (ID, nome, preço, estoque por local e categoria)
+    Parâmetros: quantidade_produtos (inteiro) e gerador (random.Random com semente)
+    Retorna: a lista de IDs cadastrados
+    """
+    if quantidade_produtos > 26 ** 3 * 1000:
+        raise ValueError("Quantidade de produtos maior que o número de IDs possíveis")
+    ids = []
+    for indice in range(quantidade_produtos):
+        id_produto = gerar_id_sintetico(indice)
+        produto = {
+            'id': id_produto,
+            'nome': f"Produto {indice}",
+            'preco': gerador.randint(100, 100000),
+            'quantidade': 0,
+            'categoria': gerador.choice(trabalho.categorias_validas),
+            'estoque_por_local': {local: gerador.randint(1, 200) for local in trabalho.locais_de_estoque}
+        }
+        assert trabalho.validar_formato_id_produto(id_produto) and trabalho.validar_nome_produto(produto['nome'])
+        trabalho.cadastrar_produto(produto)
+        ids.append(id_produto)
+    return ids
+
+def interpretar_mix(texto):
+    """
+    Converte um texto como "venda=70,busca=20" em listas paralelas de tipos e pesos
+    """
+    tipos, pesos = [], []
+    for parte in texto.split(','):
+        tipo, _, peso = parte.partition('=')
+        tipo = tipo.strip().lower()
+        if tipo not in TIPOS_DE_OPERACAO:
+            raise ValueError(f"Tipo de operação inválido no mix: {tipo} (use {', '.join(TIPOS_DE_OPERACAO)})")
+        try:
+            peso = float(peso)
+        except ValueError:
+            raise ValueError(f"Peso inválido no mix: {parte}")
+        if peso < 0:
+            raise ValueError(f"Peso negativo no mix: {parte}")
+        tipos.append(tipo)
+        pesos.append(peso)
+    if sum(pesos) <= 0:
+        raise ValueError("O mix precisa ter pelo menos um peso positivo")
+    return tipos, pesos
+
+def gerar_pedido(tipo, gerador, ids, data):
+    """
+    Sorteia uma operação de um único produto (venda ou movimentação de estoque)
+    Retorna: (tipo, operacao, argumentos, alternativa), onde alternativa é a reposição
+    (tipo, operacao, argumentos) executada quando a operação falha por falta de estoque
+    """
+    id_produto = gerador.choice(ids)
+    if tipo == 'venda':
+        local = gerador.choice(trabalho.locais_de_estoque)
+        return ('venda', 'vender', (id_produto, gerador.randint(1, 3), data, local),
+                ('estoque', 'movimentar', (id_produto, local, 100)))
+    origem, destino = gerador.sample(trabalho.locais_de_estoque, 2)
+    reposicao = ('estoque', 'movimentar', (id_produto, origem, 50))
+    if gerador.random() < 0.5:
+        return ('estoque', 'transferir', (id_produto, origem, destino, gerador.randint(1, 5)), reposicao)
+    return ('estoque', 'movimentar', (id_produto, origem, gerador.randint(-5, 20)), reposicao)
+
+def executar_operacao_geral(tipo, gerador, ids):
+    """
+    Executa uma operação que envolve o catálogo inteiro (busca, desconto ou relatório)
+    """
+    if tipo == 'busca':
+        criterio = gerador.choice(['nome', 'id', 'categoria'])
+        if criterio == 'nome':
+            trabalho.executar_operacao('buscar', 'nome', f"produto {gerador.randrange(len(ids))}")
+        elif criterio == 'id':
+            trabalho.executar_operacao('buscar', 'id', gerador.choice(ids))
+        else:
+            trabalho.executar_operacao('buscar', 'categoria', gerador.choice(trabalho.categorias_validas))
+    elif tipo == 'desconto':
+        trabalho.executar_operacao('desconto', gerador.choice(trabalho.categorias_validas), gerador.randint(1, 95))
+    else:
+        trabalho.executar_operacao('valor_total')
+        trabalho.executar_operacao('estoque_baixo', trabalho.LIMITE_ESTOQUE_BAIXO)
+        trabalho.executar_operacao('resumo_por_categoria')
+
+def despachar_pedidos(pendentes, latencias):
+    """
+    Executa de uma vez os pedidos pendentes e registra a latência de cada um
+    (do momento em que entrou na fila até a resposta, incluindo a reposição quando a operação falha)
+    Parâmetros: pendentes (lista de (instante em ns, pedido)) e latencias (dicionário tipo -> lista)
+    """
+    respostas = trabalho.executar_operacoes([(operacao, argumentos) for _, (_, operacao, argumentos, _) in pendentes])
+    reposicoes = []
+    fim = time.perf_counter_ns()
+    for (inicio, (tipo, _, _, alternativa)), (sucesso, _) in zip(pendentes, respostas):
+        if sucesso:
+            latencias[tipo].append(fim - inicio)
+        else:
+            reposicoes.append((inicio, alternativa))
+    if reposicoes:
+        trabalho.executar_operacoes([(operacao, argumentos) for _, (_, operacao, argumentos) in reposicoes])
+        fim = time.perf_counter_ns()
+        for inicio, (tipo, _, _) in reposicoes:
+            latencias[tipo].append(fim - inicio)
+    pendentes.clear()
+
+def calcular_percentil(valores_ordenados, percentil):
+    """
+    Devolve o percentil (0 a 100) de uma lista já ordenada, pelo elemento mais próximo
+    """
+    indice = round(percentil / 100 * (len(valores_ordenados) - 1))
+    return valores_ordenados[indice]
+
+def simular_carga(quantidade_produtos=10000, operacoes=100000, duracao=None, mix=MIX_PADRAO,
+                  semente=42, particionado=None, rastrear_memoria=True, tamanho_lote=TAMANHO_LOTE_PADRAO):
+    """
+    Executa a simulação e devolve as métricas coletadas
+    Parâmetros: quantidade_produtos (inteiro); operacoes (inteiro) ou duracao (segundos) -
+    quando a duração é informada ela tem prioridade; mix (string "tipo=peso,...");
+    semente (inteiro); particionado (None, 'categoria' ou 'hash');
+    rastrear_memoria (bool) - usa tracemalloc, o que deixa a execução mais lenta;
+    tamanho_lote (inteiro) - no modo particionado, quantas vendas/movimentações são
+    enviadas juntas ao roteador (1 envia uma por vez)
+    Retorna: dicionário com total de operações, tempo, latências por tipo e amostras de memória
+    """
+    if tamanho_lote < 1:
+        raise ValueError("O tamanho do lote deve ser pelo menos 1")
+    gerador = random.Random(semente)
+    tipos, pesos = interpretar_mix(mix)
+    ids = montar_catalogo_sintetico(quantidade_produtos, gerador)
+    data = trabalho.formatar_data_venda(datetime.date.today())
+
+    if particionado:
+        trabalho.iniciar_modo_particionado(particionado)
+    if rastrear_memoria:
+        tracemalloc.start()
+    # Fora do modo particionado não há roteador: cada operação é executada na hora
+    if not particionado:
+        tamanho_lote = 1
+    pendentes = []
+    latencias = {tipo: [] for tipo in TIPOS_DE_OPERACAO}
+    amostras_memoria = []
+
+    # Sorteia as operações em blocos, para o sorteio não pesar na medição
+    bloco = 1024
+    fila = []
+    realizadas = 0
+    inicio = time.perf_counter()
+    proxima_amostra = 0
+    try:
+        while True:
+            decorrido = time.perf_counter() - inicio
+            if duracao is not None:
+                if decorrido >= duracao:
+                    break
+                progresso = decorrido / duracao
+            else:
+                if realizadas >= operacoes:
+                    break
+                progresso = realizadas / operacoes
+            if progresso >= proxima_amostra / AMOSTRAS_DE_MEMORIA:
+                memoria = tracemalloc.get_traced_memory()[0] if rastrear_memoria else None
+                amostras_memoria.append((decorrido, realizadas, memoria))
+                proxima_amostra += 1
+
+            if not fila:
+                fila = gerador.choices(tipos, weights=pesos, k=bloco)
+            tipo = fila.pop()
+            if tipo in ('venda', 'estoque'):
+                pendentes.append((time.perf_counter_ns(), gerar_pedido(tipo, gerador, ids, data)))
+                if len(pendentes) >= tamanho_lote:
+                    despachar_pedidos(pendentes, latencias)
+            else:
+                # As operações do catálogo inteiro veem todas as operações sorteadas antes delas
+                if pendentes:
+                    despachar_pedidos(pendentes, latencias)
+                antes = time.perf_counter_ns()
+                executar_operacao_geral(tipo, gerador, ids)
+                latencias[tipo].append(time.perf_counter_ns() - antes)
+            realizadas += 1
+        if pendentes:
+            despachar_pedidos(pendentes, latencias)
+        tempo_total = time.perf_counter() - inicio
+        memoria = tracemalloc.get_traced_memory()[0] if rastrear_memoria else None
+        amostras_memoria.append((tempo_total, realizadas, memoria))
+    finally:
+        if rastrear_memoria:
+            tracemalloc.stop()
+        if particionado:
+            trabalho.encerrar_modo_particionado()
+
+    return {
+        'operacoes': realizadas,
+        'tempo': tempo_total,
+        'latencias': latencias,
+        'memoria': amostras_memoria,
+    }
+
+def exibir_resultados(resultado):
+    """
+    Exibe a vazão, as latências por tipo de operação e o crescimento da memória
+    """
+    print("\nRESULTADO DA SIMULAÇÃO")
+    print("=" * 70)
+    print(f"Operações: {resultado['operacoes']} em {resultado['tempo']:.2f} s")
+    print(f"Vazão sustentada: {resultado['operacoes'] / resultado['tempo']:.0f} operações/s")
+
+    print("\nLATÊNCIA POR OPERAÇÃO (microssegundos):")
+    print("-" * 70)
+    print(f"{'Operação':<12} {'Qtd':>9} {'p50':>10} {'p95':>10} {'p99':>10} {'máx.':>12}")
+    print("-" * 70)
+    for tipo, valores in resultado['latencias'].items():
+        if not valores:
+            continue
+        valores.sort()
+        print(f"{tipo:<12} {len(valores):>9} "
+              f"{calcular_percentil(valores, 50) / 1000:>10.1f} "
+              f"{calcular_percentil(valores, 95) / 1000:>10.1f} "
+              f"{calcular_percentil(valores, 99) / 1000:>10.1f} "
+              f"{valores[-1] / 1000:>12.1f}")
+    print("-" * 70)
+
+    if resultado['memoria'][0][2] is not None:
+        print("\nMEMÓRIA AO LONGO DO TEMPO (alocações Python rastreadas):")
+        print("-" * 40)
+        print(f"{'Tempo (s)':>10} {'Operações':>12} {'Memória (MB)':>14}")
+        for decorrido, realizadas, memoria in resultado['memoria']:
+            print(f"{decorrido:>10.2f} {realizadas:>12} {memoria / 1024 / 1024:>14.2f}")
+        crescimento = resultado['memoria'][-1][2] - resultado['memoria'][0][2]
+        print("-" * 40)
+        print(f"Crescimento: {crescimento / 1024 / 1024:.2f} MB")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulador de carga do sistema de produtos")
+    parser.add_argument('--produtos', type=int, default=10000, help="tamanho do catálogo sintético")
+    parser.add_argument('--operacoes', type=int, default=100000, help="número de operações a executar")
+    parser.add_argument('--duracao', type=float, help="duração em segundos (tem prioridade sobre --operacoes)")
+    parser.add_argument('--mix', default=MIX_PADRAO, help=f"pesos das operações (padrão: {MIX_PADRAO})")
+    parser.add_argument('--semente', type=int, default=42, help="semente do gerador aleatório")
+    parser.add_argument('--particionado', choices=['categoria', 'hash'], help="executa no modo particionado")
+    parser.add_argument('--lote', type=int, default=TAMANHO_LOTE_PADRAO,
+                        help="no modo particionado, vendas/movimentações enviadas juntas ao roteador")
+    parser.add_argument('--sem-memoria', action='store_true', help="não rastreia a memória (tracemalloc deixa a execução mais lenta)")
+    argumentos = parser.parse_args()
+
+    try:
+        resultado = simular_carga(argumentos.produtos, argumentos.operacoes, argumentos.duracao,
+                                  argumentos.mix, argumentos.semente, argumentos.particionado,
+                                  not argumentos.sem_memoria, argumentos.lote)
+    except ValueError as erro:
+        parser.error(str(erro))
+    exibir_resultados(resultado)
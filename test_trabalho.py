@@ -0,0 +1,140 @@
+"""Testes de regressão do sistema de gerenciamento de produtos
+
+Cada teste recarrega o módulo trabalho, o que zera o estado global (como um novo início do
+programa), e usa uma pasta de dados temporária.
+Execução: python -m pytest -q  (ou python -m unittest test_trabalho)
+"""
+
+import importlib
+import shutil
+import tempfile
+import unittest
+
+import trabalho
+
+
+def reiniciar_sistema(diretorio_dados):
+    """
+    Simula um novo início do programa: recarrega o módulo e aponta a pasta de dados
+    """
+    importlib.reload(trabalho)
+    trabalho.DIRETORIO_DADOS = diretorio_dados
+
+
+def cadastrar(id_produto, preco=10000, estoque=10, categoria="Limpeza", nome="Sabão"):
+    """
+    Cadastra um produto de teste com todo o estoque no local padrão
+    """
+    return trabalho.cadastrar_produto({"id": id_produto, "nome": nome, "preco": preco,
+                                       "quantidade": estoque, "categoria": categoria})
+
+
+class TesteComPastaDeDados(unittest.TestCase):
+    def setUp(self):
+        self.diretorio_dados = tempfile.mkdtemp()
+        reiniciar_sistema(self.diretorio_dados)
+
+    def tearDown(self):
+        if trabalho.particoes:
+            trabalho.encerrar_modo_particionado()
+        shutil.rmtree(self.diretorio_dados, ignore_errors=True)
+
+
+class TesteModoParticionado(TesteComPastaDeDados):
+    def test_lote_feito_nas_particoes_volta_para_o_historico(self):
+        for numero in range(6):
+            cadastrar(f"ABC-{numero:03d}")
+        trabalho.iniciar_modo_particionado('hash', 2)
+        trabalho.executar_operacao('lote_precos', {'categoria': 'Limpeza'}, '50', None)
+        trabalho.executar_operacao('lote_estoque', {'categoria': 'Limpeza'}, 5, trabalho.LOCAL_PADRAO)
+        trabalho.encerrar_modo_particionado()
+
+        agora = trabalho.proximo_instante_de_versao()
+        for numero in range(6):
+            produto = trabalho.encontrar_produto(f"ABC-{numero:03d}")
+            self.assertEqual(produto['preco'], 15000)
+            self.assertEqual(produto['quantidade'], 15)
+            estado = trabalho.consultar_produto_na_data(produto['id'], agora)
+            self.assertEqual(estado['preco'], 15000)
+            self.assertEqual(estado['quantidade'], 15)
+        self.assertEqual(trabalho.calcular_valor_total(), 6 * 15 * 15000)
+
+    def test_exportacao_le_as_particoes_em_partes(self):
+        for numero in range(25):
+            cadastrar(f"ABC-{numero:03d}", estoque=50)
+        trabalho.registrar_venda("ABC-000", 1, "1/01/2020")  # venda anterior ao modo particionado
+        trabalho.iniciar_modo_particionado('hash', 3)
+        trabalho.TAMANHO_PARTE_DE_LEITURA = 4
+        for numero in range(25):
+            trabalho.executar_operacao('vender', f"ABC-{numero:03d}", 1, "2/01/2020")
+        particionado = {nome: [sorted(linha.items()) for linha in gerar()]
+                        for nome, (_, gerar) in trabalho.EXPORTACOES.items()}
+
+        # Uma leitura interrompida fecha o cursor e deixa o Pipe livre para a próxima operação
+        leitura = trabalho.iterar_vendas_do_sistema()
+        next(leitura)
+        next(leitura)
+        leitura.close()
+        self.assertEqual(trabalho.executar_operacao('contar'), 25)
+
+        trabalho.encerrar_modo_particionado()
+        for nome, (_, gerar) in trabalho.EXPORTACOES.items():
+            self.assertEqual(sorted(particionado[nome]), sorted(sorted(linha.items()) for linha in gerar()), nome)
+        self.assertEqual(len(particionado['historico_de_vendas']), 26)
+
+
+class TesteAtualizacaoEmLote(TesteComPastaDeDados):
+    def test_percentual_com_mais_de_duas_casas_e_rejeitado(self):
+        cadastrar("ABC-001", preco=10000)
+        for percentual in ("12.345", "0.005", "abc", "NaN"):
+            with self.assertRaises(ValueError):
+                trabalho.reajustar_precos_em_lote([trabalho.encontrar_produto("ABC-001")], percentual=percentual)
+        self.assertEqual(trabalho.encontrar_produto("ABC-001")['preco'], 10000)
+        trabalho.reajustar_precos_em_lote([trabalho.encontrar_produto("ABC-001")], percentual="12,340")
+        self.assertEqual(trabalho.encontrar_produto("ABC-001")['preco'], 11234)
+
+
+class TesteEstadoEmDisco(TesteComPastaDeDados):
+    def test_remocao_depois_de_reiniciar_some_da_consulta_historica(self):
+        cadastrar("ABC-001")
+        cadastrar("ABC-002")
+        trabalho.salvar_estado()
+
+        reiniciar_sistema(self.diretorio_dados)
+        self.assertTrue(trabalho.carregar_estado())
+        trabalho.alterar_produto("ABC-002", 'preco', 12000)
+        # O delta da sessão tem só o campo alterado, não uma cópia completa do produto
+        self.assertEqual(trabalho.historico_de_versoes["ABC-002"]['alteracoes'][-1], {'preco': 12000})
+        antes_da_remocao = trabalho.proximo_instante_de_versao()
+        trabalho.remover_produto("ABC-001")
+        agora = trabalho.proximo_instante_de_versao()
+
+        self.assertIsNone(trabalho.consultar_produto_na_data("ABC-001", agora))
+        self.assertEqual([p['id'] for p in trabalho.consultar_catalogo_na_data(agora)], ["ABC-002"])
+        self.assertEqual(trabalho.consultar_produto_na_data("ABC-001", antes_da_remocao)['preco'], 10000)
+
+        # A remoção também precisa sobreviver a mais um reinício
+        trabalho.salvar_estado()
+        reiniciar_sistema(self.diretorio_dados)
+        trabalho.carregar_estado()
+        self.assertIsNone(trabalho.consultar_produto_na_data("ABC-001", agora))
+
+    def test_nome_das_vendas_consolidadas_depois_de_reiniciar(self):
+        cadastrar("ABC-001", nome="Sabão")
+        trabalho.registrar_venda("ABC-001", 2, "1/01/2020")
+        trabalho.compactar_historico_de_vendas()
+        trabalho.salvar_estado()
+
+        reiniciar_sistema(self.diretorio_dados)
+        trabalho.carregar_estado()
+        trabalho.alterar_produto("ABC-001", 'nome', "Detergente")
+        trabalho.registrar_venda("ABC-001", 1, "2/01/2020")
+        trabalho.compactar_historico_de_vendas()
+
+        nomes = {venda['data']: venda['produto'] for venda in trabalho.iterar_vendas()}
+        self.assertEqual(nomes, {"1/01/2020": "Sabão", "2/01/2020": "Sabão"})
+        self.assertEqual(trabalho.calcular_unidades_vendidas(), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -39,9 +39,25 @@
     6. Interface de usuário (CLI ou GUI)
     ● Menu interativo no terminal (input + loops)."""
 
-print("========================================================")
-print("Bem-vindo ao Sistema de Gerenciamento de Produtos!")
-print("========================================================\n")
+import argparse
+import bisect
+import collections
+import csv
+import datetime
+import decimal
+import gzip
+import heapq
+import io
+import itertools
+import json
+import math
+import multiprocessing
+import operator
+import os
+import sys
+import threading
+import time
+import zlib
 
 # aqui abaixo estão as funções que implementam o menu principal do sistema
 def exibir_menu():
@@ -56,16 +72,43 @@ def exibir_menu():
     print("4. Listar Produtos")
     print("5. Ordenar Produtos")
     print("6. Buscar Produto")
-    print("7. Relatórios:(Valor Total/ Estoque Baixo)")
+    print("7. Relatórios:(Valor Total/ Estoque Baixo/ Consulta Histórica)")
     print("8. Vender produto")
     print("9. Aplicar Desconto")
     print("10. Visualizar Histórico de vendas")
-    print("11. Sair")
+    print("11. Exportar Dados (CSV/JSON)")
+    print("12. Transferir Estoque entre Locais")
+    print("13. Atualização em Lote (preço/estoque)")
+    print("14. Sair")
     
 # esta lista abaixo será responsável por armazenar todos os produtos cadastrados no sistema, será util no final para pode retornar todos os dados.
 lista_produtos = []
+indice_por_id = {}  # id -> produto, para encontrar um produto sem percorrer a lista
 categorias_validas = ["Alimentos", "Limpeza", "Eletrônicos", "Vestuário"]
 historico_de_vendas = []
+# vendas antigas compactadas em totais por dia e por produto: {(dia ordinal, id): [quantidade, vendas]}
+vendas_consolidadas = {}
+nomes_produtos_vendidos = {}  # id -> nome (internado), para as vendas consolidadas não guardarem cópias do nome
+DIAS_RETENCAO_VENDAS = 90  # vendas mais recentes que isso ficam no histórico detalhado
+INTERVALO_COMPACTACAO = 100  # a cada quantas vendas registradas o histórico é compactado
+# dia (ordinal) da venda detalhada mais antiga, para a compactação só percorrer o histórico quando
+# houver venda fora da janela; None quando não se sabe (ex.: vendas trazidas das partições)
+dia_mais_antigo_detalhado = datetime.date.max.toordinal()
+LIMITE_ESTOQUE_BAIXO = 5  # produtos com menos unidades que isso são considerados com estoque baixo
+# Cada produto guarda o estoque de cada local em 'estoque_por_local'; o campo 'quantidade'
+# é o total do produto em todos os locais e é atualizado a cada movimentação.
+locais_de_estoque = ["Loja", "Depósito"]
+LOCAL_PADRAO = "Loja"  # local que recebe o estoque inicial do cadastro e as vendas sem local informado
+# Totais de cada local (unidades e valor em centavos), mantidos incrementalmente. Cada um é
+# protegido pela trava do seu local e os totais do catálogo são a soma dos locais, então
+# operações em locais diferentes não disputam o mesmo contador.
+totais_por_local = {local: {'unidades': 0, 'valor': 0} for local in locais_de_estoque}
+travas_por_local = {local: threading.Lock() for local in locais_de_estoque}
+# O total do produto ('quantidade') muda com operações de locais diferentes, então é protegido
+# por uma trava própria, escolhida pelo hash do ID entre QUANTIDADE_TRAVAS_DE_PRODUTO travas.
+# Ordem de aquisição: travas dos locais (em ordem alfabética) e, por último, travas de produto.
+QUANTIDADE_TRAVAS_DE_PRODUTO = 64
+travas_de_produto = [threading.Lock() for _ in range(QUANTIDADE_TRAVAS_DE_PRODUTO)]
 
 def validar_formato_id_produto(id_produto):
     """
@@ -116,13 +159,1729 @@ def validar_nome_produto(nome):
 def verificar_id_ja_existe(id_produto):
     """
     Verifica se um ID de produto já existe na lista de produtos
+    No modo particionado consulta o mapa de IDs do roteador
     Parâmetro: id_produto (string) - ID a ser verificado
     Retorna: True se já existe, False caso contrário
     """
+    if particoes:
+        return id_produto in mapa_id_para_particao
+    return id_produto in indice_por_id
+
+# aqui abaixo está o cache de consultas. Buscas, ordenações e relatórios repetidos entre
+# duas alterações do estoque são respondidos sem recalcular. Cada alteração chama
+# registrar_alteracao(), que incrementa a geração do estoque e a versão da categoria
+# alterada; como a versão faz parte da chave, um resultado antigo nunca é reaproveitado.
+TAMANHO_MAXIMO_CACHE = 256  # quantidade máxima de resultados guardados
+cache_de_consultas = collections.OrderedDict()  # chave -> resultado, do menos para o mais recente
+estatisticas_cache = {'acertos': 0, 'falhas': 0}
+geracao_do_estoque = 0
+versoes_por_categoria = {cat: 0 for cat in categorias_validas}
+
+def registrar_alteracao(categoria=None):
+    """
+    Registra uma alteração no estoque, invalidando as consultas em cache afetadas
+    Parâmetro: categoria (string) - categoria do produto alterado; None quando a
+    alteração afeta todas as categorias (ex.: nova ordem da lista)
+    """
+    global geracao_do_estoque
+    geracao_do_estoque += 1
+    if categoria is None:
+        for cat in versoes_por_categoria:
+            versoes_por_categoria[cat] += 1
+    elif categoria in versoes_por_categoria:
+        versoes_por_categoria[categoria] += 1
+
+def consultar_com_cache(chave, calcular):
+    """
+    Devolve o resultado guardado para a chave, ou calcula e guarda o resultado
+    Quando o cache passa de TAMANHO_MAXIMO_CACHE, o resultado usado há mais tempo é descartado
+    Parâmetros: chave (tupla) - operação, parâmetros e versão; calcular (função sem parâmetros)
+    Retorna: o resultado da consulta, que não deve ser modificado por quem chamou
+    """
+    if chave in cache_de_consultas:
+        cache_de_consultas.move_to_end(chave)
+        estatisticas_cache['acertos'] += 1
+        return cache_de_consultas[chave]
+    estatisticas_cache['falhas'] += 1
+    resultado = calcular()
+    cache_de_consultas[chave] = resultado
+    if len(cache_de_consultas) > TAMANHO_MAXIMO_CACHE:
+        cache_de_consultas.popitem(last=False)
+    return resultado
+
+def limpar_cache_de_consultas():
+    """
+    Esvazia o cache de consultas e zera as estatísticas
+    """
+    cache_de_consultas.clear()
+    estatisticas_cache['acertos'] = 0
+    estatisticas_cache['falhas'] = 0
+
+# aqui abaixo está o histórico de versões dos produtos, usado para consultar o preço e o
+# estoque de um produto em uma data passada. Cada alteração guarda só os campos que mudaram
+# (um delta), e a cada INTERVALO_PONTO_DE_CONTROLE alterações é guardada uma cópia completa
+# dos campos. Uma consulta acha a alteração com busca binária e reaplica no máximo
+# INTERVALO_PONTO_DE_CONTROLE deltas a partir da cópia mais próxima.
+# As atualizações em lote não gravam um delta por produto: cada lote vira uma única entrada em
+# lotes_de_versoes, com o campo e o novo valor de cada produto. Como os deltas são calculados
+# contra o último delta gravado (e não contra o lote), o estado de um produto em um instante é
+# o estado do seu último delta até ali mais os lotes feitos depois desse delta.
+# O lote guarda só as listas de ids e de valores; o dicionário id -> valor usado nas consultas
+# é montado na primeira consulta que passa pelo lote.
+CAMPOS_VERSIONADOS = ('nome', 'preco', 'preco_com_desconto', 'quantidade', 'categoria')
+INTERVALO_PONTO_DE_CONTROLE = 16
+# id -> {'instantes': [...], 'alteracoes': [...], 'pontos_de_controle': [...], 'ultimo_estado': {...},
+#        'salvas': quantas das alterações já estão no arquivo de versões em disco}
+historico_de_versoes = {}
+# [{'instante': ..., 'campo': ..., 'ids': [...], 'novos_valores': [...]}], em ordem de instante;
+# os lotes já gravados em disco recebem 'salvo': True
+lotes_de_versoes = []
+instantes_dos_lotes = []  # instante de cada lote (lista paralela), para a busca binária
+ultimo_instante_de_versao = 0.0
+
+def proximo_instante_de_versao():
+    """
+    Devolve o instante de uma nova versão: o horário atual, mas sempre maior que o da versão anterior,
+    para um delta e um lote nunca terem o mesmo instante
+    """
+    global ultimo_instante_de_versao
+    ultimo_instante_de_versao = max(time.time(), math.nextafter(ultimo_instante_de_versao, math.inf))
+    return ultimo_instante_de_versao
+
+def adicionar_lote_de_versoes(instante, campo, ids, novos_valores):
+    """
+    Acrescenta uma atualização em lote ao histórico, mantendo os lotes em ordem de instante
+    Parâmetros: instante (float), campo (string), ids (lista) e novos_valores (lista paralela a ids)
+    """
+    posicao = bisect.bisect_right(instantes_dos_lotes, instante)
+    instantes_dos_lotes.insert(posicao, instante)
+    lotes_de_versoes.insert(posicao, {'instante': instante, 'campo': campo, 'ids': ids, 'novos_valores': novos_valores})
+
+def valores_do_lote(lote):
+    """
+    Retorna o dicionário id -> novo valor de um lote, montando-o na primeira vez que é pedido
+    """
+    if 'valores' not in lote:
+        lote['valores'] = dict(zip(lote['ids'], lote['novos_valores']))
+    return lote['valores']
+
+def adicionar_versao(id_produto, instante, alteracao):
+    """
+    Acrescenta uma alteração (delta) ao histórico de versões de um produto
+    Parâmetros: id_produto (string), instante (float, segundos desde 1970) e
+    alteracao (dicionário só com os campos que mudaram)
+    """
+    if id_produto not in historico_de_versoes:
+        historico_de_versoes[id_produto] = {'instantes': [], 'alteracoes': [], 'pontos_de_controle': [],
+                                            'ultimo_estado': {}, 'salvas': 0}
+    versoes = historico_de_versoes[id_produto]
+    # Os instantes precisam ficar em ordem para a busca binária, mesmo se o relógio voltar
+    if versoes['instantes'] and instante < versoes['instantes'][-1]:
+        instante = versoes['instantes'][-1]
+    versoes['ultimo_estado'].update(alteracao)
+    if len(versoes['alteracoes']) % INTERVALO_PONTO_DE_CONTROLE == 0:
+        versoes['pontos_de_controle'].append(dict(versoes['ultimo_estado']))
+    versoes['instantes'].append(instante)
+    versoes['alteracoes'].append(alteracao)
+
+def aplicar_campo_em_lote(produtos, campo, novos_valores):
+    """
+    Grava um novo valor de um mesmo campo em vários produtos e registra o lote no histórico
+    como uma única entrada (em vez de um delta por produto)
+    Parâmetros: produtos (lista), campo (string) e novos_valores (lista paralela a produtos)
+    """
+    if not produtos:
+        return
+    gravar_campo_em_lote(produtos, campo, novos_valores)
+    ids = list(map(operator.itemgetter('id'), produtos))
+    adicionar_lote_de_versoes(proximo_instante_de_versao(), campo, ids, novos_valores)
+
+def aplicar_lotes_ao_estado(estado, id_produto, depois_de, ate):
+    """
+    Aplica ao estado de um produto os lotes feitos depois do instante depois_de e até o instante ate
+    Parâmetros: estado (dicionário, alterado no lugar), id_produto (string), depois_de e ate (floats)
+    """
+    inicio = bisect.bisect_right(instantes_dos_lotes, depois_de)
+    fim = bisect.bisect_right(instantes_dos_lotes, ate)
+    for lote in lotes_de_versoes[inicio:fim]:
+        valores = valores_do_lote(lote)
+        if id_produto in valores:
+            estado[lote['campo']] = valores[id_produto]
+
+def registrar_versao(produto, removido=False):
+    """
+    Registra no histórico de versões os campos do produto que mudaram desde a última versão
+    Parâmetros: produto (dicionário) e removido (bool) - True quando o produto foi excluído
+    """
+    # O delta é calculado contra a última versão do produto, que pode estar só no disco
+    garantir_versoes_carregadas()
+    versoes = historico_de_versoes.get(produto['id'])
+    anterior = versoes['ultimo_estado'] if versoes else {}
+    # Estado com os lotes feitos depois do último delta: um campo que um lote mudou e que agora
+    # voltou ao valor do último delta também precisa entrar na alteração
+    com_lotes = dict(anterior)
+    if versoes:
+        aplicar_lotes_ao_estado(com_lotes, produto['id'], versoes['instantes'][-1], math.inf)
+    alteracao = {campo: produto.get(campo) for campo in CAMPOS_VERSIONADOS
+                 if campo not in anterior or anterior[campo] != produto.get(campo)
+                 or com_lotes[campo] != produto.get(campo)}
+    if anterior.get('removido', True) != removido:
+        alteracao['removido'] = removido
+    if alteracao:
+        adicionar_versao(produto['id'], proximo_instante_de_versao(), alteracao)
+
+def consultar_produto_na_data(id_produto, instante):
+    """
+    Consulta como um produto estava em um instante passado
+    Parâmetros: id_produto (string) e instante (float, segundos desde 1970)
+    Retorna: dicionário com os campos versionados, ou None se o produto não existia
+    (ainda não cadastrado ou já excluído) nesse instante
+    """
+    garantir_versoes_carregadas()
+    versoes = historico_de_versoes.get(id_produto)
+    if versoes is None:
+        return None
+    posicao = bisect.bisect_right(versoes['instantes'], instante) - 1
+    if posicao < 0:
+        return None
+    ponto = posicao // INTERVALO_PONTO_DE_CONTROLE
+    estado = dict(versoes['pontos_de_controle'][ponto])
+    for alteracao in versoes['alteracoes'][ponto * INTERVALO_PONTO_DE_CONTROLE + 1:posicao + 1]:
+        estado.update(alteracao)
+    aplicar_lotes_ao_estado(estado, id_produto, versoes['instantes'][posicao], instante)
+    if estado.get('removido'):
+        return None
+    del estado['removido']
+    estado['id'] = id_produto
+    return estado
+
+def consultar_catalogo_na_data(instante):
+    """
+    Monta o catálogo como ele estava em um instante passado
+    Retorna: lista com o estado de cada produto que existia nesse instante
+    """
+    garantir_versoes_carregadas()
+    catalogo = []
+    for id_produto in historico_de_versoes:
+        estado = consultar_produto_na_data(id_produto, instante)
+        if estado is not None:
+            catalogo.append(estado)
+    return catalogo
+
+def converter_data_para_instante(data):
+    """
+    Converte uma data D/MM/AAAA para o último instante desse dia (horário local)
+    Retorna: o instante (float), ou None se a data for inválida
+    """
+    data = converter_data_venda(data)
+    if data is None:
+        return None
+    return datetime.datetime.combine(data, datetime.time.max).timestamp()
+
+# aqui abaixo estão as operações do estoque sem interação com o usuário.
+# As funções do menu coletam e validam as entradas e depois chamam estas funções,
+# que também são usadas pelas partições do modo particionado.
+def encontrar_produto(id_produto):
+    """
+    Procura um produto pelo ID na lista de produtos
+    Parâmetro: id_produto (string) - ID do produto procurado
+    Retorna: o dicionário do produto, ou None se ele não existir
+    """
+    return indice_por_id.get(id_produto)
+
+def reconstruir_indice_por_id():
+    """
+    Refaz o índice de IDs a partir da lista de produtos (usado quando a lista inteira é substituída)
+    """
+    indice_por_id.clear()
     for produto in lista_produtos:
-        if produto['id'] == id_produto:
-            return True
-    return False
+        indice_por_id[produto['id']] = produto
+
+# Os preços são guardados em centavos (inteiros), para que totais e descontos sejam exatos.
+# Os valores só viram texto com duas casas na hora de exibir, com formatar_centavos().
+def converter_para_centavos(texto):
+    """
+    Converte um preço digitado (ex.: "12.5" ou "12,50") para centavos
+    Arredonda para o centavo mais próximo (meio centavo arredonda para cima)
+    Parâmetro: texto (string) - preço digitado pelo usuário
+    Retorna: o preço em centavos (inteiro); lança ValueError se o texto não for um número
+    """
+    try:
+        valor = decimal.Decimal(texto.strip().replace(',', '.'))
+        return int((valor * 100).quantize(decimal.Decimal(1), rounding=decimal.ROUND_HALF_UP))
+    except (decimal.InvalidOperation, ValueError, OverflowError):
+        raise ValueError(f"Preço inválido: {texto}")
+
+def formatar_centavos(centavos):
+    """
+    Formata um valor em centavos com duas casas decimais (ex.: 1250 -> "12.50")
+    """
+    sinal = "-" if centavos < 0 else ""
+    reais, resto = divmod(abs(centavos), 100)
+    return f"{sinal}{reais}.{resto:02d}"
+
+def calcular_desconto_em_centavos(preco, desconto):
+    """
+    Calcula o preço com desconto percentual, em centavos, arredondando meio centavo para cima
+    Parâmetros: preco (inteiro, centavos) e desconto (inteiro, porcentagem)
+    """
+    return (preco * (100 - desconto) + 50) // 100
+
+def somar_valores_em_centavos(precos, quantidades):
+    """
+    Soma preço x quantidade de duas sequências paralelas de inteiros
+    O laço roda dentro do map/sum (em C), sem criar um objeto intermediário por produto
+    Retorna: o valor total em centavos
+    """
+    return sum(map(operator.mul, precos, quantidades))
+
+def gravar_campo_em_lote(dicionarios, campo, valores):
+    """
+    Grava valores[i] em dicionarios[i][campo] para cada posição das duas sequências paralelas
+    O laço roda dentro do map (em C); o deque de tamanho 0 só consome o map, sem guardar nada
+    """
+    collections.deque(map(operator.setitem, dicionarios, itertools.repeat(campo), valores), maxlen=0)
+
+def cadastrar_produto(produto):
+    """
+    Adiciona um produto já validado à lista global de produtos
+    Se o produto não informar 'estoque_por_local', toda a quantidade fica no LOCAL_PADRAO
+    Parâmetro: produto (dicionário) - produto com id, nome, preço, quantidade e categoria
+    Retorna: o próprio produto cadastrado
+    """
+    if 'estoque_por_local' not in produto:
+        produto['estoque_por_local'] = {LOCAL_PADRAO: produto['quantidade']}
+    for local in produto['estoque_por_local']:
+        validar_local(local)
+    produto['quantidade'] = sum(produto['estoque_por_local'].values())
+    travados = adquirir_travas_dos_locais(produto['estoque_por_local'])
+    try:
+        lista_produtos.append(produto)
+        indice_por_id[produto['id']] = produto
+        for local, estoque in produto['estoque_por_local'].items():
+            ajustar_totais_do_local(local, estoque, estoque * produto['preco'])
+    finally:
+        liberar_travas_dos_locais(travados)
+    registrar_versao(produto)
+    registrar_alteracao(produto['categoria'])
+    return produto
+
+def alterar_produto(id_produto, chave, novo_valor):
+    """
+    Altera uma informação (preço, nome, quantidade...) de um produto cadastrado
+    Parâmetros: id_produto (string), chave (string) - campo alterado, novo_valor
+    """
+    produto = encontrar_produto(id_produto)
+    if produto is None:
+        raise ValueError(f"Produto {id_produto} não existe")
+    if chave in ('quantidade', 'estoque_por_local'):
+        raise ValueError("O estoque deve ser alterado com movimentar_estoque() ou transferir_estoque()")
+    if chave == 'preco':
+        # O valor de cada local depende do preço: com todos os locais travados, nenhuma
+        # movimentação usa o preço antigo depois de o total ter sido ajustado
+        travados = adquirir_travas_dos_locais()
+        try:
+            for local, estoque in produto['estoque_por_local'].items():
+                ajustar_totais_do_local(local, 0, (novo_valor - produto['preco']) * estoque)
+            produto[chave] = novo_valor
+        finally:
+            liberar_travas_dos_locais(travados)
+    else:
+        produto[chave] = novo_valor
+    registrar_versao(produto)
+    registrar_alteracao(produto['categoria'])
+
+def remover_produto(id_produto):
+    """
+    Remove um produto da lista de produtos
+    Retorna: o produto removido
+    """
+    produto = encontrar_produto(id_produto)
+    if produto is None:
+        raise ValueError(f"Produto {id_produto} não existe")
+    travados = adquirir_travas_dos_locais()
+    try:
+        lista_produtos.remove(produto)
+        del indice_por_id[id_produto]
+        for local, estoque in produto['estoque_por_local'].items():
+            ajustar_totais_do_local(local, -estoque, -estoque * produto['preco'])
+    finally:
+        liberar_travas_dos_locais(travados)
+    registrar_versao(produto, removido=True)
+    registrar_alteracao(produto['categoria'])
+    return produto
+
+def trava_do_produto(id_produto):
+    """
+    Devolve a trava que protege o total ('quantidade') de um produto
+    """
+    return travas_de_produto[hash(id_produto) % QUANTIDADE_TRAVAS_DE_PRODUTO]
+
+def adquirir_travas_dos_locais(locais=None):
+    """
+    Adquire as travas dos locais informados (padrão: todos), sempre em ordem alfabética
+    Retorna: a lista de locais travados, para ser passada a liberar_travas_dos_locais()
+    """
+    travados = sorted(set(locais_de_estoque if locais is None else locais))
+    for local in travados:
+        travas_por_local[local].acquire()
+    return travados
+
+def liberar_travas_dos_locais(travados):
+    """
+    Libera as travas adquiridas por adquirir_travas_dos_locais()
+    """
+    for local in reversed(travados):
+        travas_por_local[local].release()
+
+def ajustar_totais_do_local(local, unidades, valor):
+    """
+    Soma uma variação de unidades e de valor (centavos) aos totais de um local
+    Deve ser chamada com a trava do local já adquirida
+    """
+    totais = totais_por_local[local]
+    totais['unidades'] += unidades
+    totais['valor'] += valor
+
+def somar_totais_dos_locais(campo):
+    """
+    Soma um dos totais ('unidades' ou 'valor') de todos os locais
+    Os locais ficam travados durante a soma, para ela não ver uma transferência pela metade
+    """
+    travados = adquirir_travas_dos_locais()
+    try:
+        return sum(totais[campo] for totais in totais_por_local.values())
+    finally:
+        liberar_travas_dos_locais(travados)
+
+def recalcular_totais_do_estoque():
+    """
+    Recalcula os totais de cada local percorrendo a lista de produtos
+    Usado quando a lista inteira é substituída (ex.: ao entrar ou sair do modo particionado)
+    """
+    precos = list(map(operator.itemgetter('preco'), lista_produtos))
+    travados = adquirir_travas_dos_locais()
+    try:
+        for local, totais in totais_por_local.items():
+            estoques = [p['estoque_por_local'].get(local, 0) for p in lista_produtos]
+            totais['unidades'] = sum(estoques)
+            totais['valor'] = somar_valores_em_centavos(precos, estoques)
+    finally:
+        liberar_travas_dos_locais(travados)
+
+def validar_local(local):
+    """
+    Lança ValueError se o local não estiver em locais_de_estoque
+    """
+    if local not in travas_por_local:
+        raise ValueError(f"Local inválido: {local}")
+
+def aplicar_movimentacao(produto, local, variacao):
+    """
+    Aplica uma variação no estoque de um local, nos totais do local e no total do produto
+    Deve ser chamada com a trava do local já adquirida
+    """
+    produto['estoque_por_local'][local] = produto['estoque_por_local'].get(local, 0) + variacao
+    ajustar_totais_do_local(local, variacao, variacao * produto['preco'])
+    with trava_do_produto(produto['id']):
+        produto['quantidade'] += variacao
+
+def movimentar_estoque(id_produto, local, variacao):
+    """
+    Aumenta (variação positiva) ou diminui (variação negativa) o estoque de um produto em um local
+    Parâmetros: id_produto (string), local (string) e variacao (inteiro)
+    Retorna: o novo estoque do produto nesse local
+    """
+    validar_local(local)
+    produto = encontrar_produto(id_produto)
+    if produto is None:
+        raise ValueError(f"Produto {id_produto} não existe")
+    with travas_por_local[local]:
+        if produto['estoque_por_local'].get(local, 0) + variacao < 0:
+            raise ValueError(f"Não há estoque suficiente de {id_produto} em {local}")
+        aplicar_movimentacao(produto, local, variacao)
+        novo_estoque = produto['estoque_por_local'][local]
+    registrar_versao(produto)
+    registrar_alteracao(produto['categoria'])
+    return novo_estoque
+
+def transferir_estoque(id_produto, origem, destino, quantidade):
+    """
+    Transfere unidades de um produto de um local para outro
+    As travas dos dois locais são adquiridas sempre na mesma ordem (alfabética), então
+    a retirada e a entrada acontecem juntas, sem outra operação ver um estado intermediário
+    Parâmetros: id_produto (string), origem e destino (strings) e quantidade (inteiro positivo)
+    """
+    validar_local(origem)
+    validar_local(destino)
+    if origem == destino:
+        raise ValueError("Origem e destino devem ser locais diferentes")
+    if quantidade < 1:
+        raise ValueError("A quantidade transferida deve ser positiva")
+    produto = encontrar_produto(id_produto)
+    if produto is None:
+        raise ValueError(f"Produto {id_produto} não existe")
+    primeiro, segundo = sorted((origem, destino))
+    with travas_por_local[primeiro], travas_por_local[segundo]:
+        if produto['estoque_por_local'].get(origem, 0) < quantidade:
+            raise ValueError(f"Não há estoque suficiente de {id_produto} em {origem}")
+        aplicar_movimentacao(produto, origem, -quantidade)
+        aplicar_movimentacao(produto, destino, quantidade)
+    registrar_alteracao(produto['categoria'])
+
+def aplicar_desconto_na_categoria(categoria, desconto):
+    """
+    Define o preço com desconto de todos os produtos de uma categoria
+    Parâmetros: categoria (string) e desconto (inteiro, porcentagem)
+    """
+    produtos = selecionar_produtos(categoria=categoria)
+    # Como nas atualizações em lote: preços calculados com map e uma só entrada no histórico
+    precos_com_desconto = list(map(calcular_desconto_em_centavos, map(operator.itemgetter('preco'), produtos),
+                                   itertools.repeat(desconto)))
+    aplicar_campo_em_lote(produtos, 'preco_com_desconto', precos_com_desconto)
+    registrar_alteracao(categoria)
+
+# critério de ordenação -> chave usada no sorted() (também usada para intercalar as partições)
+CHAVES_DE_ORDENACAO = {
+    'nome': lambda x: x['nome'].lower(),
+    'preco': lambda x: x['preco'],
+    'quantidade': lambda x: x['quantidade'],
+    'categoria': lambda x: x['categoria'],
+}
+
+def ordenar_produtos(criterio):
+    """
+    Ordena uma cópia da lista de produtos, sem alterar a ordem original
+    Parâmetro: criterio (string) - 'nome' (sem diferenciar maiúsculas), 'preco', 'quantidade' ou 'categoria'
+    Retorna: a lista ordenada
+    """
+    if criterio not in CHAVES_DE_ORDENACAO:
+        raise ValueError(f"Critério de ordenação inválido: {criterio}")
+    return consultar_com_cache(('ordenar', criterio, geracao_do_estoque),
+                               lambda: sorted(lista_produtos, key=CHAVES_DE_ORDENACAO[criterio]))
+
+# aqui abaixo estão as atualizações em lote: os produtos são escolhidos por um filtro, todos os
+# novos valores são calculados e validados antes, e só então aplicados de uma vez. Se um único
+# produto ficar com preço <= 0 ou estoque negativo, nenhum produto é alterado.
+def selecionar_produtos(categoria=None, preco_minimo=None, preco_maximo=None, estoque_baixo=False, ids=None):
+    """
+    Seleciona os produtos que atendem a todos os filtros informados
+    Parâmetros: categoria (string); preco_minimo e preco_maximo (centavos, inclusivos);
+    estoque_baixo (bool) - só produtos abaixo de LIMITE_ESTOQUE_BAIXO; ids (coleção de IDs)
+    Retorna: lista com os produtos selecionados
+    """
+    if ids is not None:
+        produtos = [indice_por_id[id_produto] for id_produto in ids if id_produto in indice_por_id]
+    else:
+        produtos = lista_produtos
+    return [p for p in produtos
+            if (categoria is None or p['categoria'] == categoria)
+            and (preco_minimo is None or p['preco'] >= preco_minimo)
+            and (preco_maximo is None or p['preco'] <= preco_maximo)
+            and (not estoque_baixo or p['quantidade'] < LIMITE_ESTOQUE_BAIXO)]
+
+def carregar_ids_de_arquivo(caminho):
+    """
+    Lê um arquivo de texto com um ID de produto por linha (linhas vazias são ignoradas)
+    Retorna: lista com os IDs, em maiúsculas e sem repetição; lança ValueError se algum ID for inválido
+    """
+    ids = []
+    with open(caminho, encoding='utf-8') as arquivo:
+        for numero_linha, linha in enumerate(arquivo, start=1):
+            id_produto = linha.strip().upper()
+            if not id_produto:
+                continue
+            if not validar_formato_id_produto(id_produto):
+                raise ValueError(f"ID inválido na linha {numero_linha}: {id_produto}")
+            ids.append(id_produto)
+    return list(dict.fromkeys(ids))
+
+def descrever_rejeitados(rejeitados):
+    """
+    Monta a mensagem de erro de um lote rejeitado, mostrando no máximo 5 IDs
+    """
+    exemplos = ', '.join(rejeitados[:5]) + (', ...' if len(rejeitados) > 5 else '')
+    return f"{len(rejeitados)} produto(s) ficariam inválidos: {exemplos}"
+
+def converter_percentual_em_centesimos(percentual):
+    """
+    Converte um percentual de reajuste para centésimos de ponto percentual (ex.: "-12.5" -> -1250),
+    para o cálculo ser feito só com inteiros
+    Parâmetro: percentual (string ou número, com no máximo duas casas decimais)
+    Retorna: inteiro; lança ValueError se o percentual for inválido ou tiver mais de duas casas,
+    em vez de arredondar ou truncar o valor pedido
+    """
+    try:
+        valor = decimal.Decimal(str(percentual).replace(',', '.'))
+    except decimal.InvalidOperation:
+        raise ValueError(f"Percentual inválido: {percentual}")
+    if not valor.is_finite():
+        raise ValueError(f"Percentual inválido: {percentual}")
+    centesimos = valor * 100
+    if centesimos != centesimos.to_integral_value():
+        raise ValueError(f"Percentual com mais de duas casas decimais: {percentual}")
+    return int(centesimos)
+
+def reajustar_precos_em_lote(produtos, percentual=None, valor_fixo=None, apenas_validar=False):
+    """
+    Reajusta o preço de vários produtos por um percentual ou por um valor fixo
+    Parâmetros: produtos (lista); percentual (string ou número com até duas casas decimais,
+    ex.: "-12.5" reduz 12,5%);
+    valor_fixo (inteiro, centavos, pode ser negativo) - informe só um dos dois;
+    apenas_validar (bool) - só verifica se o lote seria aceito, sem alterar nada
+    Retorna: quantidade de produtos alterados; lança ValueError se algum preço ficar <= 0
+    """
+    if (percentual is None) == (valor_fixo is None):
+        raise ValueError("Informe o percentual ou o valor fixo do reajuste")
+    if percentual is not None:
+        fator = 10000 + converter_percentual_em_centesimos(percentual)
+    precos = list(map(operator.itemgetter('preco'), produtos))
+    if percentual is not None:
+        novos_precos = [(preco * fator + 5000) // 10000 for preco in precos]
+    else:
+        novos_precos = list(map(operator.add, precos, itertools.repeat(valor_fixo)))
+
+    if novos_precos and min(novos_precos) <= 0:
+        rejeitados = [p['id'] for p, preco in zip(produtos, novos_precos) if preco <= 0]
+        raise ValueError(descrever_rejeitados(rejeitados))
+    if apenas_validar:
+        return len(produtos)
+
+    diferencas = list(map(operator.sub, novos_precos, precos))
+    estoques_dos_produtos = list(map(operator.itemgetter('estoque_por_local'), produtos))
+    travados = adquirir_travas_dos_locais()
+    try:
+        for local in travados:
+            estoques = map(operator.methodcaller('get', local, 0), estoques_dos_produtos)
+            ajustar_totais_do_local(local, 0, somar_valores_em_centavos(diferencas, estoques))
+        aplicar_campo_em_lote(produtos, 'preco', novos_precos)
+    finally:
+        liberar_travas_dos_locais(travados)
+    categorias = set(map(operator.itemgetter('categoria'), produtos))
+    for categoria in categorias:
+        registrar_alteracao(categoria)
+    return len(produtos)
+
+def ajustar_estoque_em_lote(produtos, variacao, local=LOCAL_PADRAO, apenas_validar=False):
+    """
+    Soma a mesma variação (positiva ou negativa) ao estoque de vários produtos em um local
+    Parâmetros: produtos (lista), variacao (inteiro), local (string) e
+    apenas_validar (bool) - só verifica se o lote seria aceito, sem alterar nada
+    Retorna: quantidade de produtos alterados; lança ValueError se algum estoque ficar negativo
+    """
+    validar_local(local)
+    estoques_dos_produtos = list(map(operator.itemgetter('estoque_por_local'), produtos))
+    with travas_por_local[local]:
+        novos_estoques = list(map(operator.add, map(operator.methodcaller('get', local, 0), estoques_dos_produtos),
+                                  itertools.repeat(variacao)))
+        if novos_estoques and min(novos_estoques) < 0:
+            rejeitados = [p['id'] for p, estoque in zip(produtos, novos_estoques) if estoque < 0]
+            raise ValueError(descrever_rejeitados(rejeitados))
+        if apenas_validar:
+            return len(produtos)
+
+        gravar_campo_em_lote(estoques_dos_produtos, local, novos_estoques)
+        ajustar_totais_do_local(local, variacao * len(produtos),
+                                variacao * sum(map(operator.itemgetter('preco'), produtos)))
+        # Os totais dos produtos também mudam em movimentações de outros locais: todas as
+        # travas de produto ficam adquiridas (em ordem) enquanto o lote grava as quantidades
+        for trava in travas_de_produto:
+            trava.acquire()
+        try:
+            aplicar_campo_em_lote(produtos, 'quantidade', list(map(operator.add, map(operator.itemgetter('quantidade'), produtos),
+                                                                   itertools.repeat(variacao))))
+        finally:
+            for trava in reversed(travas_de_produto):
+                trava.release()
+    categorias = set(map(operator.itemgetter('categoria'), produtos))
+    for categoria in categorias:
+        registrar_alteracao(categoria)
+    return len(produtos)
+
+def salvar_ordem_dos_produtos(produtos_ordenados):
+    """
+    Substitui a ordem padrão da lista de produtos pela ordem informada
+    """
+    lista_produtos[:] = produtos_ordenados
+    registrar_alteracao()
+
+def registrar_venda(id_produto, quantidade, data, local=LOCAL_PADRAO):
+    """
+    Baixa a quantidade vendida do estoque de um local e registra a venda no histórico
+    Parâmetros: id_produto (string), quantidade (inteiro), data (string no formato D/MM/AAAA)
+    e local (string) - local de onde sai a mercadoria
+    Retorna: dicionário com nome, preço unitário, preço total (em centavos) e novo estoque, usado no recibo
+    """
+    validar_local(local)
+    produto = encontrar_produto(id_produto)
+    if produto is None:
+        raise ValueError(f"Produto {id_produto} não existe")
+    with travas_por_local[local]:
+        disponivel = produto['estoque_por_local'].get(local, 0)
+        if quantidade < 1 or quantidade > disponivel:
+            raise ValueError(f"Quantidade deve estar entre 1 e {disponivel}")
+        aplicar_movimentacao(produto, local, -quantidade)
+    registrar_versao(produto)
+    registrar_alteracao(produto['categoria'])
+    preco = produto.get('preco_com_desconto', produto['preco'])
+    nome = sys.intern(produto['nome'])
+    historico_de_vendas.append({"data": data, "id": id_produto, "produto": nome, "quantidade_vendida": quantidade})
+    marcar_dia_da_venda(data)
+    if len(historico_de_vendas) % INTERVALO_COMPACTACAO == 0:
+        compactar_historico_de_vendas()
+    return {
+        'nome': produto['nome'],
+        'preco': preco,
+        'preco_total': preco * quantidade,
+        'novo_estoque': produto['quantidade']
+    }
+
+def converter_data_venda(data):
+    """
+    Converte a data de uma venda (string D/MM/AAAA) para datetime.date
+    Retorna: a data, ou None se ela não for uma data válida (ex.: 31/02)
+    """
+    try:
+        dia, mes, ano = data.split('/')
+        return datetime.date(int(ano), int(mes), int(dia))
+    except ValueError:
+        return None
+
+def formatar_data_venda(data):
+    """
+    Formata um datetime.date no mesmo formato usado no registro das vendas (D/MM/AAAA)
+    """
+    return f"{data.day}/{str(data.month).zfill(2)}/{data.year}"
+
+def marcar_dia_da_venda(data):
+    """
+    Atualiza dia_mais_antigo_detalhado com a data de uma venda que entrou no histórico detalhado
+    """
+    global dia_mais_antigo_detalhado
+    if dia_mais_antigo_detalhado is None:
+        return
+    data = converter_data_venda(data)
+    if data is not None:
+        dia_mais_antigo_detalhado = min(dia_mais_antigo_detalhado, data.toordinal())
+
+def compactar_historico_de_vendas(data_referencia=None):
+    """
+    Aplica a política de retenção do histórico de vendas
+    Vendas com mais de DIAS_RETENCAO_VENDAS dias são somadas em vendas_consolidadas
+    (um total por dia e por produto) e removidas do histórico detalhado
+    Parâmetro: data_referencia (datetime.date) - padrão é a data de hoje
+    Retorna: quantidade de vendas compactadas
+    """
+    global dia_mais_antigo_detalhado
+    data_limite = calcular_data_limite_da_retencao(data_referencia)
+    # Nada a compactar se nem a venda mais antiga saiu da janela de retenção
+    if dia_mais_antigo_detalhado is not None and dia_mais_antigo_detalhado >= data_limite.toordinal():
+        return 0
+
+    vendas_recentes, dia_mais_antigo = consolidar_vendas_antigas(historico_de_vendas, data_limite)
+    compactadas = len(historico_de_vendas) - len(vendas_recentes)
+    historico_de_vendas[:] = vendas_recentes
+    dia_mais_antigo_detalhado = dia_mais_antigo
+    return compactadas
+
+def calcular_data_limite_da_retencao(data_referencia=None):
+    """
+    Data a partir da qual as vendas ficam no histórico detalhado
+    Parâmetro: data_referencia (datetime.date) - padrão é a data de hoje
+    """
+    if data_referencia is None:
+        data_referencia = datetime.date.today()
+    return data_referencia - datetime.timedelta(days=DIAS_RETENCAO_VENDAS)
+
+def consolidar_vendas_antigas(vendas, data_limite):
+    """
+    Soma em vendas_consolidadas as vendas anteriores a data_limite
+    Parâmetros: vendas (lista de vendas detalhadas) e data_limite (datetime.date)
+    Retorna: (lista com as vendas que continuam detalhadas, dia ordinal da mais antiga delas)
+    """
+    vendas_recentes = []
+    dia_mais_antigo = datetime.date.max.toordinal()
+    for venda in vendas:
+        data = converter_data_venda(venda['data'])
+        # Vendas recentes ou com data inválida continuam no histórico detalhado
+        if data is None or data >= data_limite:
+            vendas_recentes.append(venda)
+            if data is not None:
+                dia_mais_antigo = min(dia_mais_antigo, data.toordinal())
+            continue
+        chave = (data.toordinal(), venda['id'])
+        if chave not in vendas_consolidadas:
+            vendas_consolidadas[chave] = [0, 0]
+        vendas_consolidadas[chave][0] += venda['quantidade_vendida']
+        vendas_consolidadas[chave][1] += 1
+        nomes_produtos_vendidos.setdefault(venda['id'], venda['produto'])
+    return vendas_recentes, dia_mais_antigo
+
+def iterar_vendas():
+    """
+    Percorre todo o histórico de vendas: primeiro as vendas consolidadas (por data),
+    depois as vendas detalhadas, todas no mesmo formato de dicionário
+    Cada item tem data, id, produto, quantidade_vendida e vendas (quantas vendas foram somadas)
+    """
+    garantir_vendas_consolidadas_carregadas()
+    for (dia, id_produto), (quantidade, vendas) in sorted(vendas_consolidadas.items()):
+        yield {
+            "data": formatar_data_venda(datetime.date.fromordinal(dia)),
+            "id": id_produto,
+            "produto": nomes_produtos_vendidos[id_produto],
+            "quantidade_vendida": quantidade,
+            "vendas": vendas
+        }
+    # Vendas detalhadas salvas em disco, lidas bloco a bloco só quando o histórico é percorrido
+    for numero, _, _ in blocos_de_vendas_em_disco:
+        for venda in carregar_bloco_de_vendas(numero):
+            yield dict(venda, vendas=1)
+    for venda in historico_de_vendas:
+        yield dict(venda, vendas=1)
+
+def calcular_unidades_vendidas():
+    """
+    Soma as unidades vendidas em todo o histórico (detalhado e consolidado)
+    """
+    return sum(venda['quantidade_vendida'] for venda in iterar_vendas())
+
+def mesclar_vendas_consolidadas(outras_vendas, outros_nomes):
+    """
+    Soma vendas consolidadas vindas de outro lugar (ex.: uma partição) às vendas_consolidadas
+    """
+    for chave, (quantidade, vendas) in outras_vendas.items():
+        if chave not in vendas_consolidadas:
+            vendas_consolidadas[chave] = [0, 0]
+        vendas_consolidadas[chave][0] += quantidade
+        vendas_consolidadas[chave][1] += vendas
+    for id_produto, nome in outros_nomes.items():
+        nomes_produtos_vendidos.setdefault(id_produto, sys.intern(nome))
+
+def buscar_produtos(criterio, termo):
+    """
+    Busca produtos por nome (parcial), ID (exato) ou categoria (exata)
+    Parâmetros: criterio (string) - 'nome', 'id' ou 'categoria'; termo (string) - valor buscado
+    Retorna: lista com os produtos encontrados, na ordem da lista de produtos
+    """
+    if criterio == 'nome':
+        termo = termo.lower()
+        return consultar_com_cache(('buscar', criterio, termo, geracao_do_estoque),
+                                   lambda: [p for p in lista_produtos if termo in p['nome'].lower()])
+    if criterio == 'id':
+        termo = termo.upper()
+        return consultar_com_cache(('buscar', criterio, termo, geracao_do_estoque),
+                                   lambda: [p for p in lista_produtos if p['id'] == termo])
+    if criterio == 'categoria':
+        termo = termo.lower()
+        # A busca por categoria só depende da versão da própria categoria
+        categoria = next((cat for cat in categorias_validas if cat.lower() == termo), None)
+        versao = versoes_por_categoria[categoria] if categoria else geracao_do_estoque
+        return consultar_com_cache(('buscar', criterio, termo, versao),
+                                   lambda: [p for p in lista_produtos if p['categoria'].lower() == termo])
+    raise ValueError(f"Critério de busca inválido: {criterio}")
+
+def calcular_valor_total():
+    """
+    Devolve o valor total do estoque (preço x quantidade de cada produto)
+    O total é mantido incrementalmente por local em totais_por_local, sem percorrer a lista
+    Retorna: o valor total em centavos
+    """
+    return somar_totais_dos_locais('valor')
+
+def calcular_unidades_em_estoque():
+    """
+    Devolve o total de unidades em estoque somando todos os produtos e locais
+    """
+    return somar_totais_dos_locais('unidades')
+
+def filtrar_estoque_baixo(limite=LIMITE_ESTOQUE_BAIXO):
+    """
+    Filtra os produtos com quantidade abaixo do limite de estoque baixo
+    Parâmetro: limite (inteiro) - quantidade mínima considerada adequada
+    Retorna: lista com os produtos com estoque baixo
+    """
+    return consultar_com_cache(('estoque_baixo', limite, geracao_do_estoque),
+                               lambda: [p for p in lista_produtos if p['quantidade'] < limite])
+
+def resumir_por_categoria():
+    """
+    Agrupa os produtos por categoria, contando produtos e somando o valor em estoque
+    Retorna: dicionário {categoria: {'count': ..., 'valor': ...}}, com o valor em centavos
+    """
+    return consultar_com_cache(('resumo_por_categoria', geracao_do_estoque), calcular_resumo_por_categoria)
+
+def calcular_resumo_por_categoria():
+    """
+    Calcula o resumo por categoria percorrendo a lista de produtos (sem cache)
+    """
+    categorias = {}
+    for produto in lista_produtos:
+        cat = produto['categoria']
+        if cat not in categorias:
+            categorias[cat] = {'count': 0, 'valor': 0}
+        categorias[cat]['count'] += 1
+        categorias[cat]['valor'] += produto['preco'] * produto['quantidade']
+    return categorias
+
+# aqui abaixo está a exportação de dados. Cada exportação é um gerador que produz uma
+# linha (dicionário) por vez, então o arquivo é escrito sem montar uma cópia dos dados em memória.
+TAMANHO_BUFFER_EXPORTACAO = 1024 * 1024  # bytes acumulados antes de cada escrita no disco
+
+def gerar_linhas_catalogo():
+    """
+    Gera uma linha de exportação para cada produto cadastrado
+    """
+    for produto in iterar_produtos_do_sistema():
+        yield {
+            'id': produto['id'],
+            'nome': produto['nome'],
+            'preco': formatar_centavos(produto['preco']),
+            'preco_com_desconto': formatar_centavos(produto['preco_com_desconto']) if 'preco_com_desconto' in produto else '',
+            'quantidade': produto['quantidade'],
+            'estoque_por_local': ';'.join(f"{local}:{qtd}" for local, qtd in produto['estoque_por_local'].items()),
+            'categoria': produto['categoria']
+        }
+
+def gerar_linhas_estoque_baixo():
+    """
+    Gera uma linha de exportação para cada produto com estoque baixo
+    """
+    for produto in iterar_produtos_do_sistema():
+        if produto['quantidade'] < LIMITE_ESTOQUE_BAIXO:
+            yield {
+                'id': produto['id'],
+                'nome': produto['nome'],
+                'quantidade': produto['quantidade'],
+                'categoria': produto['categoria']
+            }
+
+def gerar_linhas_resumo_por_categoria():
+    """
+    Gera uma linha de exportação por categoria, com quantidade de produtos e valor em estoque
+    """
+    for cat, dados in executar_operacao('resumo_por_categoria').items():
+        yield {'categoria': cat, 'produtos': dados['count'], 'valor': formatar_centavos(dados['valor'])}
+
+def gerar_linhas_historico():
+    """
+    Gera uma linha de exportação para cada registro do histórico de vendas (detalhado e consolidado)
+    """
+    for venda in iterar_vendas_do_sistema():
+        yield {
+            'data': venda['data'],
+            'id': venda['id'],
+            'produto': venda['produto'],
+            'quantidade_vendida': venda['quantidade_vendida'],
+            'vendas': venda['vendas']
+        }
+
+# nome da exportação -> (colunas, gerador de linhas)
+EXPORTACOES = {
+    'catalogo': (['id', 'nome', 'preco', 'preco_com_desconto', 'quantidade', 'estoque_por_local', 'categoria'],
+                 gerar_linhas_catalogo),
+    'estoque_baixo': (['id', 'nome', 'quantidade', 'categoria'], gerar_linhas_estoque_baixo),
+    'resumo_por_categoria': (['categoria', 'produtos', 'valor'], gerar_linhas_resumo_por_categoria),
+    'historico_de_vendas': (['data', 'id', 'produto', 'quantidade_vendida', 'vendas'], gerar_linhas_historico),
+}
+
+def abrir_arquivo_exportacao(caminho, compactar):
+    """
+    Abre o arquivo de exportação para escrita de texto com um buffer grande
+    Parâmetros: caminho (string) e compactar (bool) - se True, grava o arquivo em gzip
+    """
+    if compactar:
+        arquivo = io.BufferedWriter(gzip.GzipFile(caminho, 'wb'), buffer_size=TAMANHO_BUFFER_EXPORTACAO)
+        return io.TextIOWrapper(arquivo, encoding='utf-8', newline='')
+    return open(caminho, 'w', encoding='utf-8', newline='', buffering=TAMANHO_BUFFER_EXPORTACAO)
+
+def exportar_dados(exportacao, caminho, formato='csv', compactar=False):
+    """
+    Grava uma exportação em arquivo, linha por linha
+    Parâmetros: exportacao (string) - uma das chaves de EXPORTACOES;
+    caminho (string) - arquivo de destino; formato (string) - 'csv' ou 'jsonl';
+    compactar (bool) - grava em gzip
+    Retorna: quantidade de linhas exportadas
+    """
+    if exportacao not in EXPORTACOES:
+        raise ValueError(f"Exportação inválida: {exportacao}")
+    if formato not in ('csv', 'jsonl'):
+        raise ValueError(f"Formato inválido: {formato}")
+    colunas, gerar_linhas = EXPORTACOES[exportacao]
+
+    linhas_exportadas = 0
+    with abrir_arquivo_exportacao(caminho, compactar) as arquivo:
+        if formato == 'csv':
+            escritor = csv.DictWriter(arquivo, fieldnames=colunas)
+            escritor.writeheader()
+            for linha in gerar_linhas():
+                escritor.writerow(linha)
+                linhas_exportadas += 1
+        else:
+            for linha in gerar_linhas():
+                arquivo.write(json.dumps(linha, ensure_ascii=False))
+                arquivo.write('\n')
+                linhas_exportadas += 1
+    return linhas_exportadas
+
+# aqui abaixo está o armazenamento do estado em disco (pasta DIRETORIO_DADOS). Ao iniciar, só os
+# produtos são lidos (IDs, preços, quantidades, de onde saem o índice e os totais). O histórico de
+# vendas detalhado fica em blocos de até TAMANHO_BLOCO_VENDAS vendas, lidos só quando o histórico é
+# percorrido; no máximo ORCAMENTO_MEMORIA_VENDAS vendas desses blocos ficam em memória, e os blocos
+# usados há mais tempo são descartados. As vendas consolidadas e o histórico de versões são arquivos
+# em que cada gravação só acrescenta o que a sessão produziu; eles são lidos por inteiro no primeiro
+# uso, somados ao que já foi registrado na sessão. Para o histórico de versões, a primeira alteração
+# de um produto também é um uso, porque o delta é calculado contra a versão salva.
+DIRETORIO_DADOS = "dados"
+TAMANHO_BLOCO_VENDAS = 10000
+ORCAMENTO_MEMORIA_VENDAS = 50000  # máximo de vendas de blocos lidos do disco mantidas em memória
+# [número do arquivo, quantidade de vendas, dia ordinal da venda mais antiga] de cada bloco, em ordem
+blocos_de_vendas_em_disco = []
+blocos_de_vendas_carregados = collections.OrderedDict()  # número do bloco -> lista de vendas
+vendas_consolidadas_carregadas = True  # False enquanto há vendas consolidadas em disco ainda não lidas
+versoes_carregadas = True  # False enquanto há histórico de versões em disco ainda não lido
+
+def caminho_dos_dados(*partes):
+    """
+    Monta o caminho de um arquivo dentro da pasta de dados
+    """
+    return os.path.join(DIRETORIO_DADOS, *partes)
+
+def caminho_bloco_de_vendas(numero):
+    """
+    Caminho do arquivo de um bloco do histórico de vendas detalhado
+    """
+    return caminho_dos_dados('vendas', f'bloco_{numero:06d}.jsonl')
+
+def gravar_arquivo(caminho, linhas):
+    """
+    Grava as linhas em um arquivo temporário e só então substitui o arquivo,
+    para que uma falha no meio da gravação não deixe o arquivo antigo pela metade
+    Parâmetros: caminho (string) e linhas (iterável de strings, sem a quebra de linha)
+    """
+    temporario = caminho + '.tmp'
+    with open(temporario, 'w', encoding='utf-8') as arquivo:
+        for linha in linhas:
+            arquivo.write(linha)
+            arquivo.write('\n')
+    os.replace(temporario, caminho)
+
+def acrescentar_ao_arquivo(caminho, linhas):
+    """
+    Acrescenta linhas ao fim de um arquivo (criando-o se preciso), sem regravar o que já está nele
+    Uma linha incompleta no fim, deixada por uma gravação interrompida, é descartada antes
+    Parâmetros: caminho (string) e linhas (iterável de strings, sem a quebra de linha)
+    """
+    with open(caminho, 'r+b' if os.path.exists(caminho) else 'wb') as arquivo:
+        fim = arquivo.seek(0, os.SEEK_END)
+        posicao = fim
+        while posicao > 0:
+            inicio = max(0, posicao - 65536)
+            arquivo.seek(inicio)
+            quebra = arquivo.read(posicao - inicio).rfind(b'\n')
+            if quebra >= 0:
+                posicao = inicio + quebra + 1
+                break
+            posicao = inicio
+        arquivo.seek(posicao)
+        if posicao < fim:
+            arquivo.truncate()
+        for linha in linhas:
+            arquivo.write(linha.encode('utf-8'))
+            arquivo.write(b'\n')
+
+def ler_registros(caminho):
+    """
+    Percorre um arquivo JSON Lines, devolvendo cada linha já convertida
+    Uma última linha sem quebra de linha (gravação interrompida) é ignorada
+    """
+    with open(caminho, encoding='utf-8') as arquivo:
+        for linha in arquivo:
+            if not linha.endswith('\n'):
+                break
+            yield json.loads(linha)
+
+def carregar_bloco_de_vendas(numero):
+    """
+    Devolve as vendas de um bloco do histórico, lendo o arquivo se o bloco não estiver em memória
+    Depois da leitura, descarta os blocos usados há mais tempo até respeitar ORCAMENTO_MEMORIA_VENDAS
+    (o bloco recém-lido nunca é descartado)
+    Parâmetro: numero (inteiro) - número do bloco
+    Retorna: lista de vendas do bloco
+    """
+    if numero in blocos_de_vendas_carregados:
+        blocos_de_vendas_carregados.move_to_end(numero)
+        return blocos_de_vendas_carregados[numero]
+    bloco = []
+    for venda in ler_registros(caminho_bloco_de_vendas(numero)):
+        venda['produto'] = sys.intern(venda['produto'])
+        bloco.append(venda)
+    blocos_de_vendas_carregados[numero] = bloco
+    vendas_em_memoria = sum(len(vendas) for vendas in blocos_de_vendas_carregados.values())
+    while vendas_em_memoria > ORCAMENTO_MEMORIA_VENDAS and len(blocos_de_vendas_carregados) > 1:
+        _, descartado = blocos_de_vendas_carregados.popitem(last=False)
+        vendas_em_memoria -= len(descartado)
+    return bloco
+
+def compactar_blocos_de_vendas(data_referencia=None):
+    """
+    Aplica a política de retenção aos blocos de vendas salvos em disco
+    Só são lidos os blocos com alguma venda fora da janela: as vendas antigas vão para
+    vendas_consolidadas e o bloco é regravado com as restantes, ou apagado se ficar vazio
+    Parâmetro: data_referencia (datetime.date) - padrão é a data de hoje
+    Retorna: quantidade de vendas compactadas
+    """
+    data_limite = calcular_data_limite_da_retencao(data_referencia)
+    compactadas = 0
+    blocos_mantidos = []
+    for numero, quantidade, dia_mais_antigo in blocos_de_vendas_em_disco:
+        if dia_mais_antigo >= data_limite.toordinal():
+            blocos_mantidos.append([numero, quantidade, dia_mais_antigo])
+            continue
+        vendas_recentes, dia_mais_antigo = consolidar_vendas_antigas(carregar_bloco_de_vendas(numero), data_limite)
+        blocos_de_vendas_carregados.pop(numero, None)
+        compactadas += quantidade - len(vendas_recentes)
+        if vendas_recentes:
+            gravar_arquivo(caminho_bloco_de_vendas(numero),
+                           (json.dumps(venda, ensure_ascii=False) for venda in vendas_recentes))
+            blocos_mantidos.append([numero, len(vendas_recentes), dia_mais_antigo])
+        else:
+            os.remove(caminho_bloco_de_vendas(numero))
+    blocos_de_vendas_em_disco[:] = blocos_mantidos
+    return compactadas
+
+def calcular_dia_mais_antigo(vendas):
+    """
+    Dia ordinal da venda mais antiga da lista (vendas com data inválida não contam)
+    Retorna datetime.date.max.toordinal() se nenhuma venda tiver data válida
+    """
+    datas = map(converter_data_venda, map(operator.itemgetter('data'), vendas))
+    return min((data.toordinal() for data in datas if data is not None), default=datetime.date.max.toordinal())
+
+def salvar_vendas_em_blocos(vendas):
+    """
+    Grava vendas detalhadas nos blocos em disco: primeiro completa o último bloco, se ele
+    ainda tiver espaço, e só então abre blocos novos
+    Parâmetro: vendas (lista)
+    """
+    if vendas and blocos_de_vendas_em_disco and blocos_de_vendas_em_disco[-1][1] < TAMANHO_BLOCO_VENDAS:
+        ultimo = blocos_de_vendas_em_disco[-1]
+        complemento = vendas[:TAMANHO_BLOCO_VENDAS - ultimo[1]]
+        acrescentar_ao_arquivo(caminho_bloco_de_vendas(ultimo[0]),
+                               (json.dumps(venda, ensure_ascii=False) for venda in complemento))
+        blocos_de_vendas_carregados.pop(ultimo[0], None)  # a cópia em memória ficou desatualizada
+        ultimo[1] += len(complemento)
+        ultimo[2] = min(ultimo[2], calcular_dia_mais_antigo(complemento))
+        vendas = vendas[len(complemento):]
+    proximo_numero = blocos_de_vendas_em_disco[-1][0] + 1 if blocos_de_vendas_em_disco else 0
+    for inicio in range(0, len(vendas), TAMANHO_BLOCO_VENDAS):
+        bloco = vendas[inicio:inicio + TAMANHO_BLOCO_VENDAS]
+        gravar_arquivo(caminho_bloco_de_vendas(proximo_numero),
+                       (json.dumps(venda, ensure_ascii=False) for venda in bloco))
+        blocos_de_vendas_em_disco.append([proximo_numero, len(bloco), calcular_dia_mais_antigo(bloco)])
+        proximo_numero += 1
+
+def garantir_vendas_consolidadas_carregadas():
+    """
+    Lê as vendas consolidadas salvas em disco, se ainda não foram lidas,
+    e soma a elas as que foram consolidadas nesta sessão
+    """
+    global vendas_consolidadas_carregadas
+    if vendas_consolidadas_carregadas:
+        return
+    vendas_salvas = {}
+    nomes_salvos = {}
+    # Um mesmo dia e produto pode aparecer em mais de uma linha (gravações de sessões diferentes)
+    for dia, id_produto, nome, quantidade, vendas in ler_registros(caminho_dos_dados('vendas_consolidadas.jsonl')):
+        if (dia, id_produto) not in vendas_salvas:
+            vendas_salvas[(dia, id_produto)] = [0, 0]
+        vendas_salvas[(dia, id_produto)][0] += quantidade
+        vendas_salvas[(dia, id_produto)][1] += vendas
+        nomes_salvos.setdefault(id_produto, nome)
+    mesclar_vendas_consolidadas(vendas_salvas, {})
+    # Os nomes salvos vêm de vendas anteriores às da sessão, então prevalecem sobre os da sessão
+    for id_produto, nome in nomes_salvos.items():
+        nomes_produtos_vendidos[id_produto] = sys.intern(nome)
+    vendas_consolidadas_carregadas = True
+
+def garantir_versoes_carregadas():
+    """
+    Lê o histórico de versões salvo em disco, se ainda não foi lido
+    As versões e os lotes registrados nesta sessão e ainda não gravados são reaplicados
+    depois dos salvos, por serem mais recentes
+    """
+    global versoes_carregadas
+    if versoes_carregadas:
+        return
+    versoes_da_sessao = dict(historico_de_versoes)
+    lotes_da_sessao = [lote for lote in lotes_de_versoes if not lote.get('salvo')]
+    historico_de_versoes.clear()
+    lotes_de_versoes.clear()
+    instantes_dos_lotes.clear()
+    for registro in ler_registros(caminho_dos_dados('versoes.jsonl')):
+        if registro[0] == 'versao':
+            _, id_produto, instante, alteracao = registro
+            adicionar_versao(id_produto, instante, alteracao)
+        else:
+            _, instante, campo, ids, novos_valores = registro
+            adicionar_lote_de_versoes(instante, campo, ids, novos_valores)
+    for versoes in historico_de_versoes.values():
+        versoes['salvas'] = len(versoes['alteracoes'])
+    for lote in lotes_de_versoes:
+        lote['salvo'] = True
+    for id_produto, versoes in versoes_da_sessao.items():
+        for instante, alteracao in zip(versoes['instantes'][versoes['salvas']:], versoes['alteracoes'][versoes['salvas']:]):
+            adicionar_versao(id_produto, instante, alteracao)
+    for lote in lotes_da_sessao:
+        adicionar_lote_de_versoes(lote['instante'], lote['campo'], lote['ids'], lote['novos_valores'])
+    versoes_carregadas = True
+
+def salvar_versoes():
+    """
+    Acrescenta ao arquivo de versões só as alterações e os lotes ainda não gravados,
+    sem ler nem regravar o histórico que já está em disco
+    """
+    linhas = []
+    for id_produto, versoes in historico_de_versoes.items():
+        salvas = versoes['salvas']
+        for instante, alteracao in zip(versoes['instantes'][salvas:], versoes['alteracoes'][salvas:]):
+            linhas.append(json.dumps(['versao', id_produto, instante, alteracao], ensure_ascii=False))
+        versoes['salvas'] = len(versoes['alteracoes'])
+    for lote in lotes_de_versoes:
+        if not lote.get('salvo'):
+            linhas.append(json.dumps(['lote', lote['instante'], lote['campo'], lote['ids'], lote['novos_valores']],
+                                     ensure_ascii=False))
+            lote['salvo'] = True
+    if linhas:
+        acrescentar_ao_arquivo(caminho_dos_dados('versoes.jsonl'), linhas)
+
+def salvar_estado():
+    """
+    Salva produtos, histórico de vendas e histórico de versões na pasta DIRETORIO_DADOS
+    Os blocos de vendas já salvos só são regravados quando a retenção tira vendas deles;
+    vendas consolidadas e versões da sessão são acrescentadas aos arquivos existentes
+    Retorna: quantidade de produtos salvos
+    """
+    global dia_mais_antigo_detalhado
+    os.makedirs(caminho_dos_dados('vendas'), exist_ok=True)
+    gravar_arquivo(caminho_dos_dados('produtos.jsonl'),
+                   (json.dumps(produto, ensure_ascii=False) for produto in lista_produtos))
+
+    # Vendas antigas (da sessão e dos blocos em disco) vão para as consolidadas antes de irem para o disco
+    compactar_blocos_de_vendas()
+    compactar_historico_de_vendas()
+    salvar_vendas_em_blocos(historico_de_vendas)
+    gravar_arquivo(caminho_dos_dados('vendas', 'blocos.json'), [json.dumps(blocos_de_vendas_em_disco)])
+    historico_de_vendas.clear()
+    dia_mais_antigo_detalhado = datetime.date.max.toordinal()
+
+    linhas = (json.dumps([dia, id_produto, nomes_produtos_vendidos[id_produto], quantidade, vendas], ensure_ascii=False)
+              for (dia, id_produto), (quantidade, vendas) in sorted(vendas_consolidadas.items()))
+    if vendas_consolidadas_carregadas:
+        # Tudo já está em memória: o arquivo é regravado, juntando linhas repetidas de um mesmo dia
+        gravar_arquivo(caminho_dos_dados('vendas_consolidadas.jsonl'), linhas)
+    else:
+        # Só as consolidadas da sessão estão em memória; depois de gravadas, passam a ser lidas do disco
+        acrescentar_ao_arquivo(caminho_dos_dados('vendas_consolidadas.jsonl'), linhas)
+        vendas_consolidadas.clear()
+
+    salvar_versoes()
+    return len(lista_produtos)
+
+def carregar_estado():
+    """
+    Carrega o estado salvo por salvar_estado(), lendo apenas os produtos
+    O histórico de vendas e o histórico de versões ficam em disco até o primeiro uso
+    Retorna: True se havia estado salvo, False caso contrário
+    """
+    global vendas_consolidadas_carregadas, versoes_carregadas
+    if not os.path.exists(caminho_dos_dados('produtos.jsonl')):
+        return False
+    produtos = []
+    with open(caminho_dos_dados('produtos.jsonl'), encoding='utf-8') as arquivo:
+        for linha in arquivo:
+            produtos.append(json.loads(linha))
+    lista_produtos[:] = produtos
+    reconstruir_indice_por_id()
+    recalcular_totais_do_estoque()
+    registrar_alteracao()
+    limpar_cache_de_consultas()  # os resultados guardados são da lista anterior
+
+    blocos_de_vendas_em_disco.clear()
+    if os.path.exists(caminho_dos_dados('vendas', 'blocos.json')):
+        with open(caminho_dos_dados('vendas', 'blocos.json'), encoding='utf-8') as arquivo:
+            blocos_de_vendas_em_disco.extend(json.load(arquivo))
+    blocos_de_vendas_carregados.clear()
+    vendas_consolidadas_carregadas = not os.path.exists(caminho_dos_dados('vendas_consolidadas.jsonl'))
+    versoes_carregadas = not os.path.exists(caminho_dos_dados('versoes.jsonl'))
+    return True
+
+# aqui abaixo está o modo particionado: o catálogo é dividido (por categoria ou por
+# hash do ID) entre processos trabalhadores, e um roteador no processo principal
+# envia cada operação para a partição dona do produto ou para todas as partições.
+# Cada partição leva o histórico de versões dos seus produtos; as vendas registradas antes
+# do modo particionado ficam no roteador e são somadas às das partições nas consultas.
+particoes = []  # lista de (processo, conexão) de cada partição ativa
+mapa_id_para_particao = {}
+criterio_de_particao = None
+# As exportações leem produtos e vendas das partições em partes de TAMANHO_PARTE_DE_LEITURA itens,
+# por um cursor aberto na partição, para o roteador nunca montar a lista inteira em memória
+TAMANHO_PARTE_DE_LEITURA = 1000
+cursores_abertos = {}  # número do cursor -> iterador ainda não esgotado
+numeros_de_cursor = itertools.count()
+
+def abrir_cursor(fonte):
+    """
+    Abre uma leitura em partes dos produtos ('produtos') ou do histórico de vendas ('vendas')
+    Retorna: número do cursor, usado em ler_cursor() e fechar_cursor()
+    """
+    if fonte == 'produtos':
+        iterador = iter(lista_produtos)
+    elif fonte == 'vendas':
+        iterador = iterar_vendas()
+    else:
+        raise ValueError(f"Fonte de leitura inválida: {fonte}")
+    numero = next(numeros_de_cursor)
+    cursores_abertos[numero] = iterador
+    return numero
+
+def ler_cursor(numero, tamanho):
+    """
+    Devolve os próximos itens de um cursor (até tamanho); o cursor é fechado quando se esgota
+    Retorna: lista de itens - com menos de tamanho itens quando a leitura acabou
+    """
+    itens = list(itertools.islice(cursores_abertos[numero], tamanho))
+    if len(itens) < tamanho:
+        del cursores_abertos[numero]
+    return itens
+
+def fechar_cursor(numero):
+    """
+    Fecha um cursor antes do fim da leitura
+    """
+    cursores_abertos.pop(numero, None)
+
+OPERACOES_DA_PARTICAO = {
+    'cadastrar': cadastrar_produto,
+    'encontrar': encontrar_produto,
+    'alterar': alterar_produto,
+    'remover': remover_produto,
+    'vender': registrar_venda,
+    'movimentar': movimentar_estoque,
+    'transferir': transferir_estoque,
+    'buscar': buscar_produtos,
+    'ordenar': ordenar_produtos,
+    'desconto': aplicar_desconto_na_categoria,
+    'contar_selecionados': lambda filtro: len(selecionar_produtos(**filtro)),
+    'lote_precos': lambda filtro, percentual, valor_fixo, apenas_validar=False:
+        reajustar_precos_em_lote(selecionar_produtos(**filtro), percentual, valor_fixo, apenas_validar),
+    'lote_estoque': lambda filtro, variacao, local, apenas_validar=False:
+        ajustar_estoque_em_lote(selecionar_produtos(**filtro), variacao, local, apenas_validar),
+    'contar': lambda: len(lista_produtos),
+    'valor_total': calcular_valor_total,
+    'unidades_em_estoque': calcular_unidades_em_estoque,
+    'estoque_baixo': filtrar_estoque_baixo,
+    'resumo_por_categoria': resumir_por_categoria,
+    'listar': lambda: list(lista_produtos),
+    'abrir_cursor': abrir_cursor,
+    'ler_cursor': ler_cursor,
+    'fechar_cursor': fechar_cursor,
+    'unidades_vendidas': calcular_unidades_vendidas,
+    'consultar_na_data': consultar_produto_na_data,
+    'catalogo_na_data': consultar_catalogo_na_data,
+}
+# operações de um único produto já cadastrado: o ID é o primeiro argumento e a
+# operação vai só para a partição dona dele ('cadastrar' e 'remover' também alteram o mapa de IDs)
+OPERACOES_POR_ID = {'encontrar', 'alterar', 'vender', 'movimentar', 'transferir'}
+
+def executar_na_particao(operacao, argumentos):
+    """
+    Executa uma operação na partição e monta a resposta para o roteador
+    Qualquer erro vira uma resposta de erro, para o processo trabalhador continuar atendendo
+    Retorna: (True, resultado) ou (False, mensagem de erro)
+    """
+    try:
+        return True, OPERACOES_DA_PARTICAO[operacao](*argumentos)
+    except ValueError as erro:
+        return False, str(erro)
+    except Exception as erro:
+        return False, f"{type(erro).__name__}: {erro}"
+
+def executar_particao(conexao, produtos, versoes, lotes):
+    """
+    Laço principal de um processo trabalhador do modo particionado
+    Guarda apenas os produtos da sua partição e atende as operações enviadas pelo roteador
+    Parâmetros: conexao (Connection) - ponta do Pipe do trabalhador; produtos (lista) - produtos da partição;
+    versoes (dicionário) - histórico de versões desses produtos; lotes (lista) - lotes_de_versoes do roteador
+    """
+    global dia_mais_antigo_detalhado, vendas_consolidadas_carregadas, versoes_carregadas
+    # No fork o trabalhador herda o estado do roteador; ele fica só com os dados da partição
+    particoes.clear()
+    mapa_id_para_particao.clear()
+    lista_produtos[:] = produtos
+    reconstruir_indice_por_id()
+    recalcular_totais_do_estoque()
+    registrar_alteracao()
+    limpar_cache_de_consultas()  # os resultados guardados são da lista anterior
+    historico_de_vendas.clear()
+    dia_mais_antigo_detalhado = datetime.date.max.toordinal()
+    vendas_consolidadas.clear()
+    nomes_produtos_vendidos.clear()
+    historico_de_versoes.clear()
+    historico_de_versoes.update(versoes)
+    # No fork, lotes é a própria lista lotes_de_versoes herdada: o tamanho é guardado antes de a
+    # partição acrescentar lotes, para saber quais foram feitos aqui
+    lotes_herdados = len(lotes)
+    lotes_de_versoes[:] = lotes
+    instantes_dos_lotes[:] = [lote['instante'] for lote in lotes]
+    # O estado salvo em disco pertence ao roteador; a partição começa sem histórico de vendas
+    blocos_de_vendas_em_disco.clear()
+    blocos_de_vendas_carregados.clear()
+    vendas_consolidadas_carregadas = True
+    versoes_carregadas = True
+    while True:
+        operacao, argumentos = conexao.recv()
+        if operacao == 'encerrar':
+            # Só os lotes feitos na partição voltam; os anteriores continuam no roteador
+            conexao.send((True, (list(lista_produtos), list(historico_de_vendas), vendas_consolidadas,
+                                 nomes_produtos_vendidos, historico_de_versoes, lotes_de_versoes[lotes_herdados:])))
+            break
+        if operacao == 'varias':
+            # Vários pedidos numa só mensagem: uma resposta para cada um, na mesma ordem
+            conexao.send((True, [executar_na_particao(*pedido) for pedido in argumentos]))
+        else:
+            conexao.send(executar_na_particao(operacao, argumentos))
+    conexao.close()
+
+def calcular_particao(produto, criterio, quantidade_particoes):
+    """
+    Define qual partição é dona de um produto
+    Usa o índice da categoria em categorias_validas, ou o crc32 do ID (estável entre processos)
+    Retorna: o índice da partição
+    """
+    if criterio == 'categoria':
+        return categorias_validas.index(produto['categoria'])
+    return zlib.crc32(produto['id'].encode()) % quantidade_particoes
+
+def iniciar_modo_particionado(criterio='categoria', quantidade_particoes=None):
+    """
+    Divide lista_produtos entre processos trabalhadores e ativa o roteador
+    Os produtos (e o histórico de versões deles) passam para as partições; o processo principal
+    fica só com o mapa de IDs até encerrar_modo_particionado()
+    Parâmetros: criterio (string) - 'categoria' ou 'hash';
+    quantidade_particoes (inteiro) - só usado no critério 'hash', padrão é o número de núcleos
+    """
+    global criterio_de_particao
+    if particoes:
+        raise ValueError("O modo particionado já está ativo")
+    if criterio == 'categoria':
+        quantidade_particoes = len(categorias_validas)
+    elif criterio == 'hash':
+        quantidade_particoes = quantidade_particoes or os.cpu_count() or 1
+    else:
+        raise ValueError(f"Critério de partição inválido: {criterio}")
+
+    garantir_versoes_carregadas()
+    grupos = [[] for _ in range(quantidade_particoes)]
+    versoes_dos_grupos = [{} for _ in range(quantidade_particoes)]
+    for produto in lista_produtos:
+        indice = calcular_particao(produto, criterio, quantidade_particoes)
+        grupos[indice].append(produto)
+        mapa_id_para_particao[produto['id']] = indice
+        if produto['id'] in historico_de_versoes:
+            versoes_dos_grupos[indice][produto['id']] = historico_de_versoes.pop(produto['id'])
+
+    for grupo, versoes in zip(grupos, versoes_dos_grupos):
+        conexao_roteador, conexao_particao = multiprocessing.Pipe()
+        processo = multiprocessing.Process(target=executar_particao,
+                                           args=(conexao_particao, grupo, versoes, lotes_de_versoes), daemon=True)
+        processo.start()
+        conexao_particao.close()
+        particoes.append((processo, conexao_roteador))
+    criterio_de_particao = criterio
+    lista_produtos.clear()
+    reconstruir_indice_por_id()
+    recalcular_totais_do_estoque()
+    registrar_alteracao()
+    limpar_cache_de_consultas()  # os resultados guardados são da lista anterior
+
+def receber_resposta(conexao):
+    """
+    Recebe a resposta de uma partição e repassa o erro como ValueError, se houver
+    """
+    sucesso, resultado = conexao.recv()
+    if not sucesso:
+        raise ValueError(resultado)
+    return resultado
+
+def executar_por_id(id_produto, operacao, *argumentos):
+    """
+    Roteia uma operação de um único produto para a partição dona do ID
+    Exemplo: executar_por_id('ABC-123', 'vender', 'ABC-123', 2, '1/01/2025')
+    Retorna: o resultado da operação na partição
+    """
+    if id_produto not in mapa_id_para_particao:
+        raise ValueError(f"Produto {id_produto} não existe")
+    conexao = particoes[mapa_id_para_particao[id_produto]][1]
+    conexao.send((operacao, argumentos))
+    return receber_resposta(conexao)
+
+def executar_varias_por_id(pedidos):
+    """
+    Envia várias operações de um único produto sem esperar a resposta de cada uma
+    Os pedidos são agrupados por partição e cada partição recebe uma só mensagem; todas as
+    mensagens são enviadas antes de qualquer resposta ser lida, então as partições trabalham
+    ao mesmo tempo. Pedidos do mesmo produto são executados na ordem da lista.
+    Parâmetro: pedidos (lista de (operacao, argumentos)), com o ID do produto em argumentos[0]
+    Retorna: lista de (sucesso, resultado ou mensagem de erro), na ordem dos pedidos
+    """
+    respostas = [None] * len(pedidos)
+    posicoes_por_particao = {}
+    for posicao, (operacao, argumentos) in enumerate(pedidos):
+        indice = mapa_id_para_particao.get(argumentos[0])
+        if indice is None:
+            respostas[posicao] = (False, f"Produto {argumentos[0]} não existe")
+        else:
+            posicoes_por_particao.setdefault(indice, []).append(posicao)
+    for indice, posicoes in posicoes_por_particao.items():
+        particoes[indice][1].send(('varias', [pedidos[posicao] for posicao in posicoes]))
+    for indice, posicoes in posicoes_por_particao.items():
+        for posicao, resposta in zip(posicoes, receber_resposta(particoes[indice][1])):
+            respostas[posicao] = resposta
+    return respostas
+
+def cadastrar_produto_particionado(produto):
+    """
+    Cadastra um produto novo na partição correspondente e registra o ID no roteador
+    """
+    if produto['id'] in mapa_id_para_particao:
+        raise ValueError(f"Produto {produto['id']} já existe")
+    indice = calcular_particao(produto, criterio_de_particao, len(particoes))
+    mapa_id_para_particao[produto['id']] = indice
+    try:
+        return executar_por_id(produto['id'], 'cadastrar', produto)
+    except ValueError:
+        del mapa_id_para_particao[produto['id']]
+        raise
+
+def remover_produto_particionado(id_produto):
+    """
+    Remove um produto na partição dona dele e tira o ID do mapa do roteador
+    """
+    produto = executar_por_id(id_produto, 'remover', id_produto)
+    del mapa_id_para_particao[id_produto]
+    return produto
+
+def mesclar_resultados(operacao, resultados, argumentos):
+    """
+    Junta as respostas das partições de uma operação distribuída
+    Soma valores, combina os resumos por categoria, intercala as ordenações e concatena as listas
+    O histórico anterior ao modo particionado, que ficou no roteador, entra nas consultas de histórico
+    """
+    if operacao in ('valor_total', 'unidades_em_estoque', 'contar', 'contar_selecionados', 'lote_precos', 'lote_estoque'):
+        return sum(resultados)
+    if operacao == 'unidades_vendidas':
+        return sum(resultados) + calcular_unidades_vendidas()
+    if operacao == 'desconto':
+        return None
+    if operacao == 'consultar_na_data':
+        estado = consultar_produto_na_data(*argumentos)
+        return next((r for r in resultados if r is not None), estado)
+    if operacao == 'ordenar':
+        return list(heapq.merge(*resultados, key=CHAVES_DE_ORDENACAO[argumentos[0]]))
+    if operacao == 'resumo_por_categoria':
+        categorias = {}
+        for resumo in resultados:
+            for cat, dados in resumo.items():
+                if cat not in categorias:
+                    categorias[cat] = {'count': 0, 'valor': 0}
+                categorias[cat]['count'] += dados['count']
+                categorias[cat]['valor'] += dados['valor']
+        return categorias
+    mesclado = []
+    if operacao == 'catalogo_na_data':
+        mesclado.extend(consultar_catalogo_na_data(*argumentos))
+    for resultado in resultados:
+        mesclado.extend(resultado)
+    return mesclado
+
+def executar_em_todas_particoes(operacao, *argumentos):
+    """
+    Envia uma operação para todas as partições e mescla as respostas
+    Os pedidos são enviados antes de qualquer resposta ser lida, então as partições trabalham em paralelo
+    Todas as respostas são lidas mesmo quando alguma partição devolve erro, para nenhuma ficar no Pipe
+    Exemplo: executar_em_todas_particoes('buscar', 'nome', 'arroz')
+    """
+    for _, conexao in particoes:
+        conexao.send((operacao, argumentos))
+    respostas = [conexao.recv() for _, conexao in particoes]
+    erros = [resultado for sucesso, resultado in respostas if not sucesso]
+    if erros:
+        raise ValueError('; '.join(erros))
+    return mesclar_resultados(operacao, [resultado for _, resultado in respostas], argumentos)
+
+def particao_da_consulta(operacao, argumentos):
+    """
+    Descobre se uma busca ou desconto só envolve uma partição, para não consultar todas
+    Buscas por ID vão para a partição dona do ID; no critério 'categoria', buscas por
+    categoria e descontos vão para a partição da categoria
+    Retorna: o índice da partição, -1 se nenhuma partição tem resultado, ou None para consultar todas
+    """
+    if operacao == 'buscar' and argumentos[0] == 'id':
+        return mapa_id_para_particao.get(argumentos[1].upper(), -1)
+    if criterio_de_particao == 'categoria' and operacao in ('buscar', 'desconto'):
+        if operacao == 'buscar' and argumentos[0] != 'categoria':
+            return None
+        termo = (argumentos[1] if operacao == 'buscar' else argumentos[0]).lower()
+        categoria = next((cat for cat in categorias_validas if cat.lower() == termo), None)
+        if categoria is None:
+            return -1 if operacao == 'buscar' else None
+        return categorias_validas.index(categoria)
+    return None
+
+def executar_operacao(operacao, *argumentos):
+    """
+    Executa uma operação de OPERACOES_DA_PARTICAO no próprio processo ou, no modo particionado,
+    pelo roteador. As funções do menu consultam e alteram o estoque por aqui.
+    Exemplo: executar_operacao('vender', 'ABC-123', 2, '1/01/2025', 'Loja')
+    """
+    if not particoes:
+        return OPERACOES_DA_PARTICAO[operacao](*argumentos)
+    if operacao == 'cadastrar':
+        return cadastrar_produto_particionado(*argumentos)
+    if operacao == 'remover':
+        return remover_produto_particionado(*argumentos)
+    if operacao in OPERACOES_POR_ID:
+        if operacao == 'encontrar' and argumentos[0] not in mapa_id_para_particao:
+            return None
+        return executar_por_id(argumentos[0], operacao, *argumentos)
+    indice = particao_da_consulta(operacao, argumentos)
+    if indice is not None:
+        if indice < 0:
+            return []
+        conexao = particoes[indice][1]
+        conexao.send((operacao, argumentos))
+        return receber_resposta(conexao)
+    if operacao in ('lote_precos', 'lote_estoque'):
+        # Todas as partições validam o lote antes de qualquer uma aplicar, para o lote continuar
+        # sendo tudo ou nada
+        executar_em_todas_particoes(operacao, *argumentos, True)
+    return executar_em_todas_particoes(operacao, *argumentos)
+
+def executar_operacoes(pedidos):
+    """
+    Executa várias operações de um único produto (OPERACOES_POR_ID) e devolve o resultado de cada uma
+    No modo particionado os pedidos vão juntos para as partições (executar_varias_por_id);
+    um pedido que falha não interrompe os demais
+    Parâmetro: pedidos (lista de (operacao, argumentos))
+    Retorna: lista de (sucesso, resultado ou mensagem de erro), na ordem dos pedidos
+    """
+    for operacao, _ in pedidos:
+        if operacao not in OPERACOES_POR_ID:
+            raise ValueError(f"Operação não pode ser enviada em grupo: {operacao}")
+    if particoes:
+        return executar_varias_por_id(pedidos)
+    respostas = []
+    for operacao, argumentos in pedidos:
+        try:
+            respostas.append((True, OPERACOES_DA_PARTICAO[operacao](*argumentos)))
+        except ValueError as erro:
+            respostas.append((False, str(erro)))
+    return respostas
+
+def produtos_do_sistema():
+    """
+    Devolve os produtos cadastrados; no modo particionado, reúne os produtos de todas as partições
+    """
+    if particoes:
+        return executar_em_todas_particoes('listar')
+    return lista_produtos
+
+def iterar_em_todas_particoes(fonte):
+    """
+    Percorre os produtos ('produtos') ou as vendas ('vendas') das partições, uma partição por vez,
+    pedindo TAMANHO_PARTE_DE_LEITURA itens por mensagem; só a parte atual fica em memória no roteador
+    Cada parte é pedida só depois de a anterior ser percorrida, então nenhuma resposta fica
+    pendente no Pipe entre um item e outro
+    """
+    for _, conexao in particoes:
+        conexao.send(('abrir_cursor', (fonte,)))
+        cursor = receber_resposta(conexao)
+        esgotado = False
+        try:
+            while not esgotado:
+                conexao.send(('ler_cursor', (cursor, TAMANHO_PARTE_DE_LEITURA)))
+                parte = receber_resposta(conexao)
+                esgotado = len(parte) < TAMANHO_PARTE_DE_LEITURA
+                yield from parte
+        finally:
+            # Leitura interrompida (ex.: erro na gravação do arquivo): libera o cursor na partição
+            if not esgotado:
+                conexao.send(('fechar_cursor', (cursor,)))
+                receber_resposta(conexao)
+
+def iterar_produtos_do_sistema():
+    """
+    Percorre os produtos cadastrados sem montar uma lista; no modo particionado, lê as partições em partes
+    """
+    if particoes:
+        yield from iterar_em_todas_particoes('produtos')
+    else:
+        yield from lista_produtos
+
+def iterar_vendas_do_sistema():
+    """
+    Percorre o histórico de vendas; no modo particionado, o do roteador (anterior ao modo
+    particionado) e depois o das partições, lido em partes
+    """
+    yield from iterar_vendas()
+    if particoes:
+        yield from iterar_em_todas_particoes('vendas')
+
+def encerrar_modo_particionado():
+    """
+    Encerra os processos trabalhadores e traz os produtos e vendas de volta para o processo principal
+    """
+    global criterio_de_particao, dia_mais_antigo_detalhado
+    for _, conexao in particoes:
+        conexao.send(('encerrar', ()))
+    produtos = []
+    for processo, conexao in particoes:
+        produtos_da_particao, vendas_da_particao, consolidadas, nomes, versoes, lotes = receber_resposta(conexao)
+        produtos.extend(produtos_da_particao)
+        historico_de_vendas.extend(vendas_da_particao)
+        dia_mais_antigo_detalhado = None
+        mesclar_vendas_consolidadas(consolidadas, nomes)
+        # A partição devolve o histórico completo dos seus produtos (o que levou e o que registrou)
+        historico_de_versoes.update(versoes)
+        for lote in lotes:
+            adicionar_lote_de_versoes(lote['instante'], lote['campo'], lote['ids'], lote['novos_valores'])
+        conexao.close()
+        processo.join()
+    lista_produtos[:] = produtos
+    reconstruir_indice_por_id()
+    recalcular_totais_do_estoque()
+    registrar_alteracao()
+    limpar_cache_de_consultas()  # os resultados guardados são da lista anterior
+    particoes.clear()
+    mapa_id_para_particao.clear()
+    criterio_de_particao = None
+
+def solicitar_local(mensagem):
+    """
+    Pede ao usuário um local de estoque, com até 3 tentativas
+    Parâmetro: mensagem (string) - texto exibido no input
+    Retorna: o local escolhido, ou None se as tentativas acabarem
+    """
+    tentativas_invalidas = 0
+    while True:
+        print(f"Locais disponíveis: {', '.join(locais_de_estoque)}")
+        local = input(mensagem).strip().capitalize()
+        if local in locais_de_estoque:
+            return local
+        tentativas_invalidas += 1
+        print("Erro: Local inválido.")
+        if tentativas_invalidas >= 3:
+            return None
 
 def cadastrar_novo_produto():
     """
@@ -176,7 +1935,7 @@ def cadastrar_novo_produto():
     tentativas_invalidas = 0
     while True:
         try:
-            preco_produto = float(input("Digite o preço do produto: R$ "))
+            preco_produto = converter_para_centavos(input("Digite o preço do produto: R$ "))
             
             # Verifica se o preço é positivo
             if preco_produto <= 0:
@@ -241,11 +2000,11 @@ def cadastrar_novo_produto():
     }
     
     # Adiciona o produto à lista global
-    lista_produtos.append(produto)
+    executar_operacao('cadastrar', produto)
     
     # Confirma o cadastro para o usuário
     print(f"\nProduto '{nome_produto}' cadastrado com sucesso!")
-    print(f"ID: {id_produto} | Preço: R$ {preco_produto:.2f} | Quantidade: {quantidade_produto}")
+    print(f"ID: {id_produto} | Preço: R$ {formatar_centavos(preco_produto)} | Quantidade: {quantidade_produto} (em {LOCAL_PADRAO})")
     return produto
 
 def atualizar_informacoes_produto():
@@ -296,16 +2055,14 @@ def atualizar_informacoes_produto():
        Função genérica para atualizar uma informação específica de um produto.
        Mostra um loop que percorre a lista global: lista_produtos e modifica algum valor a partir de um id, que são os paramêtros
       """
-      for i in lista_produtos:
-        if i["id"] == id_para_atualizar:
-          i[chave] = novo_valor
+      executar_operacao('alterar', id_para_atualizar, chave, novo_valor)
 
     # Atualização de cada uma das opções
     if opcao_para_editar == 1:
       tentativas_invalidas = 0
       while True:
         try:
-            novo_preco = float(input("Digite um novo preço: "))
+            novo_preco = converter_para_centavos(input("Digite um novo preço: "))
             if novo_preco <= 0:
                 tentativas_invalidas += 1
                 print("O novo preço deve ser superior a 0")
@@ -348,58 +2105,62 @@ def atualizar_informacoes_produto():
             if tentativas_invalidas >= 3:
                 print("Muitas tentativas inválidas. Cancelando atualização de estoque.")
                 return
-      for i in lista_produtos:
-          if i["id"] == id_para_atualizar:
-            if operacao == "+":
-                tentativas_invalidas = 0
-                while True:
-                    try:
-                        quantidade = int(input("Digite o valor que você quer aumentar: + "))
-                        if quantidade <= 0:
-                            tentativas_invalidas += 1
-                            print("Erro: A quantidade deve ser positiva.")
-                            if tentativas_invalidas >= 3:
-                                print("Muitas tentativas inválidas. Cancelando atualização de estoque.")
-                                return
-                            continue
-                        break
-                    except ValueError:
-                        tentativas_invalidas += 1
-                        print("Erro: Digite um número válido.")
-                        if tentativas_invalidas >= 3:
-                            print("Muitas tentativas inválidas. Cancelando atualização de estoque.")
-                            return
-                nova_quantidade = i["quantidade"] + quantidade
+      local = solicitar_local("Digite o local do estoque: ")
+      if local is None:
+          print("Muitas tentativas inválidas. Cancelando atualização de estoque.")
+          return
+      i = executar_operacao('encontrar', id_para_atualizar)
+      if operacao == "+":
+          tentativas_invalidas = 0
+          while True:
+              try:
+                  quantidade = int(input("Digite o valor que você quer aumentar: + "))
+                  if quantidade <= 0:
+                      tentativas_invalidas += 1
+                      print("Erro: A quantidade deve ser positiva.")
+                      if tentativas_invalidas >= 3:
+                          print("Muitas tentativas inválidas. Cancelando atualização de estoque.")
+                          return
+                      continue
+                  break
+              except ValueError:
+                  tentativas_invalidas += 1
+                  print("Erro: Digite um número válido.")
+                  if tentativas_invalidas >= 3:
+                      print("Muitas tentativas inválidas. Cancelando atualização de estoque.")
+                      return
+          variacao = quantidade
             
-            elif operacao == "-":
-                tentativas_invalidas = 0
-                while True:
-                    try:
-                        quantidade = int(input("Digite o valor que você quer diminuir: - "))
-                        if quantidade <= 0:
-                            tentativas_invalidas += 1
-                            print("Erro: A quantidade deve ser positiva.")
-                            if tentativas_invalidas >= 3:
-                                print("Muitas tentativas inválidas. Cancelando atualização de estoque.")
-                                return
-                            continue
-                        if quantidade > i["quantidade"]:
-                            tentativas_invalidas += 1
-                            print(f"Erro: Não há estoque suficiente para remover essa quantidade.")
-                            if tentativas_invalidas >= 3:
-                                print("Muitas tentativas inválidas. Cancelando atualização de estoque.")
-                                return
-                            continue
-                        break
-                    except ValueError:
-                        tentativas_invalidas += 1
-                        print("Erro: Digite um número válido.")
-                        if tentativas_invalidas >= 3:
-                            print("Muitas tentativas inválidas. Cancelando atualização de estoque.")
-                            return
-                nova_quantidade = i["quantidade"] - quantidade
+      elif operacao == "-":
+          tentativas_invalidas = 0
+          while True:
+              try:
+                  quantidade = int(input("Digite o valor que você quer diminuir: - "))
+                  if quantidade <= 0:
+                      tentativas_invalidas += 1
+                      print("Erro: A quantidade deve ser positiva.")
+                      if tentativas_invalidas >= 3:
+                          print("Muitas tentativas inválidas. Cancelando atualização de estoque.")
+                          return
+                      continue
+                  if quantidade > i["estoque_por_local"].get(local, 0):
+                      tentativas_invalidas += 1
+                      print(f"Erro: Não há estoque suficiente em {local} para remover essa quantidade.")
+                      if tentativas_invalidas >= 3:
+                          print("Muitas tentativas inválidas. Cancelando atualização de estoque.")
+                          return
+                      continue
+                  break
+              except ValueError:
+                  tentativas_invalidas += 1
+                  print("Erro: Digite um número válido.")
+                  if tentativas_invalidas >= 3:
+                      print("Muitas tentativas inválidas. Cancelando atualização de estoque.")
+                      return
+          variacao = -quantidade
    
-      atualizar_informacao(nova_quantidade, "quantidade")
+      executar_operacao('movimentar', id_para_atualizar, local, variacao)
+      nova_quantidade = executar_operacao('encontrar', id_para_atualizar)["quantidade"]
       print("\nEstoque atualizado com sucesso!\n")
       # Caso o estoque zere
       if nova_quantidade == 0:
@@ -420,21 +2181,19 @@ def excluir_produto_do_sistema():
         print("Esse produto não existe")
         id_para_excluir = input("Digite o id do produto que você deseja excluir: ").upper()
     # Verifica se o produto está sem estoque
-    for i in lista_produtos:
-      if i['id'] == id_para_excluir:
-        if i["quantidade"] == 0:
-            print("Não é possível excluir produto sem estoque!")
-            break
-        # Confirmação se o usuário quer mesmo exluir o produto
-        confirmacao = input(f"Confirmação obrigatória: Você realmente deseja remover {i['nome']}? (S/N) ").upper()
-        while confirmacao != "S" and confirmacao != "N":
-            confirmacao = input("Digite S para continuar a exclusão e N para cancelar: ").upper()
-        if confirmacao == "S":
-            lista_produtos.remove(i)
-            print(f"\nExclusão de {i['nome']} feita com sucesso!\n")
-            break
-        else:
-            print("\nExclusão cancelada\n")
+    i = executar_operacao('encontrar', id_para_excluir)
+    if i["quantidade"] == 0:
+        print("Não é possível excluir produto sem estoque!")
+        return
+    # Confirmação se o usuário quer mesmo exluir o produto
+    confirmacao = input(f"Confirmação obrigatória: Você realmente deseja remover {i['nome']}? (S/N) ").upper()
+    while confirmacao != "S" and confirmacao != "N":
+        confirmacao = input("Digite S para continuar a exclusão e N para cancelar: ").upper()
+    if confirmacao == "S":
+        executar_operacao('remover', id_para_excluir)
+        print(f"\nExclusão de {i['nome']} feita com sucesso!\n")
+    else:
+        print("\nExclusão cancelada\n")
     
 def exibir_lista_de_produtos():
     """
@@ -443,7 +2202,8 @@ def exibir_lista_de_produtos():
     Inclui informações de ID, nome, preço, quantidade, categoria e status do estoque
     """
     # Verifica se há produtos cadastrados
-    if not lista_produtos:
+    produtos = produtos_do_sistema()
+    if not produtos:
         print("\nNenhum produto cadastrado.")
         return
     
@@ -454,20 +2214,20 @@ def exibir_lista_de_produtos():
     print("-" * 90)
     
     # Percorre todos os produtos e exibe suas informações
-    for produto in lista_produtos:
-        # Define status do estoque (baixo se menor que 5 unidades)
-        status = "BAIXO" if produto['quantidade'] < 5 else "OK"
+    for produto in produtos:
+        # Define status do estoque (baixo se menor que LIMITE_ESTOQUE_BAIXO unidades)
+        status = "BAIXO" if produto['quantidade'] < LIMITE_ESTOQUE_BAIXO else "OK"
 
         # Define o preço com desconto, se estiver presente em produto
-        preco_com_desconto = f"R${produto['preco_com_desconto']:.2f}" if 'preco_com_desconto' in produto else "   --"
+        preco_com_desconto = f"R${formatar_centavos(produto['preco_com_desconto'])}" if 'preco_com_desconto' in produto else "   --"
         
         # Formata e exibe as informações do produto
-        print(f"{produto['id']:<8} {produto['nome']:<20} R${produto['preco']:<9.2f} "
+        print(f"{produto['id']:<8} {produto['nome']:<20} R${formatar_centavos(produto['preco']):<9} "
               f"{produto['quantidade']:<5} {produto['categoria']:<15} {preco_com_desconto:<15} {status}")
     
     # logo abaixo é tipo um rodapé com o total de produtos cadastrados
     print("-" * 90)
-    print(f"Total de produtos: {len(lista_produtos)}")
+    print(f"Total de produtos: {len(produtos)}")
 
 def ordenar_produtos_por_criterio():
     """
@@ -476,7 +2236,7 @@ def ordenar_produtos_por_criterio():
     Permite salvar a nova ordenação como padrão
     """
     # Verifica se há produtos para ordenar
-    if not lista_produtos:
+    if not executar_operacao('contar'):
         print("\nNenhum produto cadastrado.")
         return
     
@@ -491,25 +2251,23 @@ def ordenar_produtos_por_criterio():
     try:
         opcao = int(input("Digite a opção: "))
         
-        # Cria uma cópia da lista para não alterar a original inicialmente
-        produtos_ordenados = lista_produtos.copy()
-        
+        # Ordena uma cópia da lista para não alterar a original inicialmente
         # Aplica a ordenação conforme a opção escolhida
         if opcao == 1:
             # Ordena por nome (sem diferenciação de maiúsculas/minúsculas)
-            produtos_ordenados.sort(key=lambda x: x['nome'].lower())
+            produtos_ordenados = executar_operacao('ordenar', 'nome')
             print("\nProdutos ordenados por NOME (A-Z):")
         elif opcao == 2:
             # Ordena por preço (menor para maior)
-            produtos_ordenados.sort(key=lambda x: x['preco'])
+            produtos_ordenados = executar_operacao('ordenar', 'preco')
             print("\nProdutos ordenados por PREÇO (mais barato → mais caro):")
         elif opcao == 3:
             # Ordena por quantidade (menor para maior)
-            produtos_ordenados.sort(key=lambda x: x['quantidade'])
+            produtos_ordenados = executar_operacao('ordenar', 'quantidade')
             print("\nProdutos ordenados por QUANTIDADE (menor → maior estoque):")
         elif opcao == 4:
             # Ordena por categoria (ordem alfabética)
-            produtos_ordenados.sort(key=lambda x: x['categoria'])
+            produtos_ordenados = executar_operacao('ordenar', 'categoria')
             print("\nProdutos ordenados por CATEGORIA (A-Z):")
         else:
             print("Opção inválida.")
@@ -525,19 +2283,24 @@ def ordenar_produtos_por_criterio():
     print("-" * 80)
     
     for produto in produtos_ordenados:
-        status = "BAIXO" if produto['quantidade'] < 5 else "OK"
-        print(f"{produto['id']:<8} {produto['nome']:<20} R${produto['preco']:<9.2f} "
+        status = "BAIXO" if produto['quantidade'] < LIMITE_ESTOQUE_BAIXO else "OK"
+        print(f"{produto['id']:<8} {produto['nome']:<20} R${formatar_centavos(produto['preco']):<9} "
               f"{produto['quantidade']:<5} {produto['categoria']:<15} {status}")
     
     print("-" * 80)
-    print(f"Total de produtos: {len(lista_produtos)}")
+    print(f"Total de produtos: {len(produtos_ordenados)}")
     
+    # No modo particionado cada partição guarda os seus produtos, então não há uma ordem única para salvar
+    if particoes:
+        print("\nNo modo particionado a ordenação não pode ser salva como padrão.")
+        return
+
     # Pergunta se quer salvar a nova ordenação
     try:
         salvar = input("\nDeseja salvar esta ordenação como nova ordem padrão? (S/N): ").upper()
         if salvar == 'S':
             # Substitui a lista original pela lista ordenada
-            lista_produtos[:] = produtos_ordenados
+            salvar_ordem_dos_produtos(produtos_ordenados)
             print("Nova ordem salva como padrão!")
         else:
             print("Ordem não foi salva. Lista mantém ordem original.")
@@ -551,7 +2314,7 @@ def buscar_produto_no_sistema():
     Exibe todos os produtos encontrados que correspondem ao critério
     """
     # Verifica se há produtos para buscar
-    if not lista_produtos:
+    if not executar_operacao('contar'):
         print("\nNenhum produto cadastrado.")
         return
     
@@ -569,19 +2332,19 @@ def buscar_produto_no_sistema():
         if opcao == 1:
             # Busca por nome (permite busca parcial, sem diferenciação de maiúsculas)
             termo = input("Digite o nome (ou parte do nome): ").lower()
-            produtos_encontrados = [p for p in lista_produtos if termo in p['nome'].lower()]
+            produtos_encontrados = executar_operacao('buscar', 'nome', termo)
             tipo_busca = "nome"
             
         elif opcao == 2:
             # Busca por ID (busca exata)
             termo = input("Digite o ID: ").upper()
-            produtos_encontrados = [p for p in lista_produtos if p['id'] == termo]
+            produtos_encontrados = executar_operacao('buscar', 'id', termo)
             tipo_busca = "ID"
             
         elif opcao == 3:
             # Busca por categoria (busca exata, sem diferenciação de maiúsculas)
             termo = input("Digite a categoria: ")
-            produtos_encontrados = [p for p in lista_produtos if p['categoria'].lower() == termo.lower()]
+            produtos_encontrados = executar_operacao('buscar', 'categoria', termo)
             tipo_busca = "categoria"
             
         else:
@@ -601,8 +2364,8 @@ def buscar_produto_no_sistema():
         
         # Exibe cada produto encontrado
         for produto in produtos_encontrados:
-            status = "BAIXO" if produto['quantidade'] < 5 else "OK"
-            print(f"{produto['id']:<8} {produto['nome']:<20} R${produto['preco']:<9.2f} "
+            status = "BAIXO" if produto['quantidade'] < LIMITE_ESTOQUE_BAIXO else "OK"
+            print(f"{produto['id']:<8} {produto['nome']:<20} R${formatar_centavos(produto['preco']):<9} "
                   f"{produto['quantidade']:<5} {produto['categoria']:<15} {status}")
         
         print("-" * 80)
@@ -617,7 +2380,7 @@ def gerar_relatorios_do_sistema():
     Calcula e exibe estatísticas importantes do estoque
     """
     # Verifica se há produtos para gerar relatórios
-    if not lista_produtos:
+    if not executar_operacao('contar'):
         print("\nNenhum produto cadastrado.")
         return
     
@@ -626,12 +2389,13 @@ def gerar_relatorios_do_sistema():
     print("1. Valor Total do Estoque")
     print("2. Produtos com Estoque Baixo")
     print("3. Relatório Completo")
+    print("4. Consulta Histórica (preço/estoque em uma data)")
     
     tentativas_invalidas = 0
     while True:
         try:
             opcao = int(input("Digite a opção: "))
-            if 1 <= opcao <= 3:
+            if 1 <= opcao <= 4:
                 break
             else:
                 tentativas_invalidas += 1
@@ -649,13 +2413,13 @@ def gerar_relatorios_do_sistema():
     if opcao == 1:
         # Relatório 1: Valor total do estoque
         # Calcula o valor total multiplicando preço por quantidade de cada produto
-        valor_total = sum(p['preco'] * p['quantidade'] for p in lista_produtos)
-        print(f"\nVALOR TOTAL DO ESTOQUE: R$ {valor_total:.2f}")
+        valor_total = executar_operacao('valor_total')
+        print(f"\nVALOR TOTAL DO ESTOQUE: R$ {formatar_centavos(valor_total)}")
         
     elif opcao == 2:
         # Relatório 2: Produtos com estoque baixo
-        limite = 5  # Define o limite para considerar estoque baixo
-        produtos_baixo = [p for p in lista_produtos if p['quantidade'] < limite]
+        limite = LIMITE_ESTOQUE_BAIXO  # Define o limite para considerar estoque baixo
+        produtos_baixo = executar_operacao('estoque_baixo', limite)
         
         print(f"\nPRODUTOS COM ESTOQUE BAIXO (menos de {limite} unidades):")
         if produtos_baixo:
@@ -665,7 +2429,7 @@ def gerar_relatorios_do_sistema():
             
             # Exibe cada produto com estoque baixo
             for produto in produtos_baixo:
-                print(f"{produto['id']:<8} {produto['nome']:<20} R${produto['preco']:<9.2f} "
+                print(f"{produto['id']:<8} {produto['nome']:<20} R${formatar_centavos(produto['preco']):<9} "
                       f"{produto['quantidade']:<5} {produto['categoria']:<15}")
             
             print("-" * 80)
@@ -676,36 +2440,68 @@ def gerar_relatorios_do_sistema():
     elif opcao == 3:
         # Relatório 3: Relatório completo
         # Calcula valor total do estoque
-        valor_total = sum(p['preco'] * p['quantidade'] for p in lista_produtos)
-        produtos_baixo = [p for p in lista_produtos if p['quantidade'] < 5]
+        valor_total = executar_operacao('valor_total')
+        produtos_baixo = executar_operacao('estoque_baixo', LIMITE_ESTOQUE_BAIXO)
         
         # Agrupa produtos por categoria para estatísticas
-        categorias = {}
-        for produto in lista_produtos:
-            cat = produto['categoria']
-            if cat not in categorias:
-                categorias[cat] = {'count': 0, 'valor': 0}
-            categorias[cat]['count'] += 1
-            categorias[cat]['valor'] += produto['preco'] * produto['quantidade']
+        categorias = executar_operacao('resumo_por_categoria')
         
         # Exibe o relatório completo
         print("\nRELATÓRIO COMPLETO DO ESTOQUE")
         print("=" * 50)
-        print(f"Valor total do estoque: R$ {valor_total:.2f}")
-        print(f"Total de produtos: {len(lista_produtos)}")
+        print(f"Valor total do estoque: R$ {formatar_centavos(valor_total)}")
+        print(f"Total de produtos: {executar_operacao('contar')}")
+        print(f"Total de unidades em estoque: {executar_operacao('unidades_em_estoque')}")
         print(f"Produtos com estoque baixo: {len(produtos_baixo)}")
+        print(f"Unidades vendidas (histórico): {executar_operacao('unidades_vendidas')}")
+        print(f"Cache de consultas: {estatisticas_cache['acertos']} acertos | {estatisticas_cache['falhas']} falhas")
         
         # Resumo por categoria
         print("\nRESUMO POR CATEGORIA:")
         print("-" * 40)
         for cat, dados in categorias.items():
-            print(f"{cat}: {dados['count']} produtos | R$ {dados['valor']:.2f}")
+            print(f"{cat}: {dados['count']} produtos | R$ {formatar_centavos(dados['valor'])}")
         
         # Lista produtos com estoque baixo se houver
         if produtos_baixo:
             print(f"\nPRODUTOS COM ESTOQUE BAIXO:")
             for produto in produtos_baixo:
                 print(f"- {produto['nome']} ({produto['id']}): {produto['quantidade']} unidades")
+
+    elif opcao == 4:
+        # Relatório 4: como o catálogo (ou um produto) estava no fim de uma data
+        tentativas_invalidas = 0
+        while True:
+            data = input("Digite a data da consulta (D/MM/AAAA): ").strip()
+            instante = converter_data_para_instante(data)
+            if instante is not None:
+                break
+            tentativas_invalidas += 1
+            print("Erro: Data inválida.")
+            if tentativas_invalidas >= 3:
+                print("Muitas tentativas inválidas. Cancelando geração de relatórios.")
+                return
+        id_produto = input("Digite o ID do produto (ou Enter para todo o catálogo): ").strip().upper()
+
+        if id_produto:
+            estado = executar_operacao('consultar_na_data', id_produto, instante)
+            produtos_na_data = [estado] if estado is not None else []
+        else:
+            produtos_na_data = executar_operacao('catalogo_na_data', instante)
+
+        if not produtos_na_data:
+            print(f"\nNenhum produto cadastrado em {data}.")
+            return
+        print(f"\nPRODUTOS EM {data} (fim do dia):")
+        print("-" * 90)
+        print(f"{'ID':<8} {'Nome':<20} {'Preço':<10} {'Qtd':<5} {'Categoria':<15} {'Preço c/Desc':<15}")
+        print("-" * 90)
+        for produto in produtos_na_data:
+            preco_com_desconto = f"R${formatar_centavos(produto['preco_com_desconto'])}" if produto['preco_com_desconto'] is not None else "   --"
+            print(f"{produto['id']:<8} {produto['nome']:<20} R${formatar_centavos(produto['preco']):<9} "
+                  f"{produto['quantidade']:<5} {produto['categoria']:<15} {preco_com_desconto:<15}")
+        print("-" * 90)
+        print(f"Total de produtos: {len(produtos_na_data)}")
     
 def processar_venda_de_produto():
     """
@@ -714,7 +2510,7 @@ def processar_venda_de_produto():
     """
     print("\n===Menu de Venda===")
     # Verifica se há produtos para buscar
-    if len(lista_produtos) == 0:
+    if executar_operacao('contar') == 0:
         print("\nNenhum produto cadastrado.")
         return
         
@@ -724,15 +2520,24 @@ def processar_venda_de_produto():
     while not verificar_id_ja_existe(id_para_vender):
         print("Esse produto não existe")
         id_para_vender = input("Digite o id do produto que você deseja vender: ").upper()
+
+    # Local de onde sai a mercadoria
+    local = solicitar_local("Digite o local da venda: ")
+    if local is None:
+        print("Muitas tentativas inválidas. Cancelando venda.")
+        return
     
     # Verifica se é valida a quantidade 
     quantidade = int(input("Digite quantos produtos você deseja vender: "))
     
-    for i in lista_produtos:
-      if i['id'] == id_para_vender:
-        while quantidade <1 or quantidade>i['quantidade']:
-          print(f"Você deve digitar um número entre 0 e {i['quantidade']}")
-          quantidade = int(input("Digite quantos produtos você deseja vender: "))
+    i = executar_operacao('encontrar', id_para_vender)
+    disponivel = i['estoque_por_local'].get(local, 0)
+    if disponivel == 0:
+      print(f"Não há estoque desse produto em {local}.")
+      return
+    while quantidade <1 or quantidade>disponivel:
+      print(f"Você deve digitar um número entre 0 e {disponivel}")
+      quantidade = int(input("Digite quantos produtos você deseja vender: "))
 
     # Data
     dia = int(input("Digite o dia: "))
@@ -751,47 +2556,42 @@ def processar_venda_de_produto():
       print("Esse ano é inválido!")
       ano = input("Digite o ano no formato AAAA: ")
 
-    # Registrar venda
-    for i in lista_produtos:
-      if i['id'] == id_para_vender:
-        i['quantidade'] = i['quantidade'] - quantidade
-        novo_estoque = i['quantidade']
-    # Cálculo de Preço total 
-    for i in lista_produtos:
-      if i['id'] == id_para_vender:
-        if 'preco_com_desconto' in i:
-          preco = i['preco_com_desconto']
-        else:
-          preco = i['preco']
-        preco_total = preco * quantidade
-        nome = i['nome'] 
+    # Registrar venda (baixa no estoque, cálculo do preço total e histórico)
+    venda = executar_operacao('vender', id_para_vender, quantidade, f"{dia}/{mes}/{ano}", local)
+    nome = venda['nome']
+    preco = venda['preco']
+    preco_total = venda['preco_total']
+    novo_estoque = venda['novo_estoque']
     print("\nProduto vendido com sucesso!")
     # Alerta de estoque vazio
     if novo_estoque == 0:
         print("Alerta: Estoque vazio!")
     # Recibo de venda
-    preco_formatado = f"R${preco:.2f}"
-    preco_total_formatado = f"R${preco_total:.2f}"
+    preco_formatado = f"R${formatar_centavos(preco)}"
+    preco_total_formatado = f"R${formatar_centavos(preco_total)}"
     largura = max(len(nome), len(preco_total_formatado))
     print("\nRECIBO")
     print(f"{'Nome do produto':40} {nome:>{largura}}")
     print(f"{'Quantidade de produtos em estoque':40} {novo_estoque:>{largura}}")
     print(f"{'Preço unitário':40} {preco_formatado:>{largura}}")
     print(f"{'Preço total':40} {preco_total_formatado:>{largura}}\n")
-    
-    # dicionário e lista com histórico de venda 
-    produto_vendido = {"data":f"{dia}/{mes}/{ano}", "produto": nome, "quantidade_vendida": quantidade}
-    historico_de_vendas.append(produto_vendido)
 
 def visualizar_historico_de_vendas():
+    """
+    Função para exibir o histórico de vendas
+    Vendas mais antigas que a janela de retenção aparecem somadas por dia e por produto
+    """
     print("\n===Histórico de vendas===\n")
     cont=0
-    for i in historico_de_vendas:
+    for i in iterar_vendas_do_sistema():
       cont+=1
       print(f"\n{cont}.")
       print(i['data'])
       print(f"Produto: {i['produto']}")
-      print(f"Quantidade vendida: {i['quantidade_vendida']}\n")
+      print(f"Quantidade vendida: {i['quantidade_vendida']}")
+      if i['vendas'] > 1:
+        print(f"Vendas consolidadas: {i['vendas']}")
+      print()
 
 def aplicar_desconto_em_produto():
     """
@@ -833,52 +2633,284 @@ def aplicar_desconto_em_produto():
             return
     print(f"\nDefinido {desconto}% de desconto na categoria {categoria}\n")
 
-    for i in lista_produtos:
-      if i['categoria'] == categoria:
-        preco = i['preco']
-        preco_com_desconto = preco * (1 - desconto / 100)
-        i['preco_com_desconto'] = round(preco_com_desconto, 2)
+    executar_operacao('desconto', categoria, desconto)
+
+def exportar_dados_do_sistema():
+    """
+    Função para exportar dados do sistema para arquivo CSV ou JSON Lines
+    Permite escolher o conteúdo, o formato, a compactação gzip e o nome do arquivo
+    """
+    print("\n===EXPORTAR DADOS===")
+    print("O que você deseja exportar?")
+    print("1. Catálogo de produtos")
+    print("2. Produtos com estoque baixo")
+    print("3. Resumo por categoria")
+    print("4. Histórico de vendas")
+    exportacoes = ['catalogo', 'estoque_baixo', 'resumo_por_categoria', 'historico_de_vendas']
+
+    tentativas_invalidas = 0
+    while True:
+        try:
+            opcao = int(input("Digite a opção: "))
+            if 1 <= opcao <= 4:
+                break
+            tentativas_invalidas += 1
+            print("Opção inválida.")
+        except ValueError:
+            tentativas_invalidas += 1
+            print("Entrada inválida.")
+        if tentativas_invalidas >= 3:
+            print("Muitas tentativas inválidas. Cancelando exportação.")
+            return
+    exportacao = exportacoes[opcao - 1]
+
+    tentativas_invalidas = 0
+    while True:
+        formato = input("Digite o formato (CSV ou JSONL): ").strip().lower()
+        if formato in ('csv', 'jsonl'):
+            break
+        tentativas_invalidas += 1
+        print("Erro: Formato deve ser CSV ou JSONL.")
+        if tentativas_invalidas >= 3:
+            print("Muitas tentativas inválidas. Cancelando exportação.")
+            return
+
+    compactar = input("Deseja compactar o arquivo com gzip? (S/N): ").upper() == 'S'
+    nome_padrao = f"{exportacao}.{formato}" + (".gz" if compactar else "")
+    caminho = input(f"Digite o nome do arquivo (Enter para '{nome_padrao}'): ").strip() or nome_padrao
+
+    try:
+        linhas_exportadas = exportar_dados(exportacao, caminho, formato, compactar)
+    except OSError as erro:
+        print(f"Erro ao gravar o arquivo: {erro}")
+        return
+    print(f"\n{linhas_exportadas} linhas exportadas para '{caminho}' com sucesso!\n")
+
+def transferir_estoque_entre_locais():
+    """
+    Função para transferir unidades de um produto de um local de estoque para outro
+    A retirada da origem e a entrada no destino acontecem juntas
+    """
+    print("\n===TRANSFERÊNCIA DE ESTOQUE===\n")
+    tentativas_invalidas = 0
+    while True:
+        id_produto = input("Digite o id do produto que você deseja transferir: ").upper()
+        if verificar_id_ja_existe(id_produto):
+            break
+        tentativas_invalidas += 1
+        print("Esse produto não existe")
+        if tentativas_invalidas >= 3:
+            print("Muitas tentativas inválidas. Cancelando transferência.")
+            return
+
+    produto = executar_operacao('encontrar', id_produto)
+    for local in locais_de_estoque:
+        print(f"{local}: {produto['estoque_por_local'].get(local, 0)} unidades")
+
+    origem = solicitar_local("Digite o local de origem: ")
+    destino = solicitar_local("Digite o local de destino: ") if origem else None
+    if origem is None or destino is None:
+        print("Muitas tentativas inválidas. Cancelando transferência.")
+        return
+    if origem == destino:
+        print("Erro: Origem e destino devem ser diferentes.")
+        return
+
+    disponivel = produto['estoque_por_local'].get(origem, 0)
+    tentativas_invalidas = 0
+    while True:
+        try:
+            quantidade = int(input("Digite a quantidade a transferir: "))
+            if 1 <= quantidade <= disponivel:
+                break
+            tentativas_invalidas += 1
+            print(f"Erro: A quantidade deve estar entre 1 e {disponivel}.")
+        except ValueError:
+            tentativas_invalidas += 1
+            print("Erro: Digite um número válido.")
+        if tentativas_invalidas >= 3:
+            print("Muitas tentativas inválidas. Cancelando transferência.")
+            return
+
+    executar_operacao('transferir', id_produto, origem, destino, quantidade)
+    print(f"\n{quantidade} unidades de {produto['nome']} transferidas de {origem} para {destino}!\n")
+
+def solicitar_opcao(mensagem, maximo):
+    """
+    Pede ao usuário uma opção numérica de 1 até maximo, com até 3 tentativas
+    Retorna: a opção escolhida, ou None se as tentativas acabarem
+    """
+    tentativas_invalidas = 0
+    while True:
+        try:
+            opcao = int(input(mensagem))
+            if 1 <= opcao <= maximo:
+                return opcao
+            print(f"Erro: Selecione uma opção de 1 a {maximo}.")
+        except ValueError:
+            print("Erro: Digite um número válido.")
+        tentativas_invalidas += 1
+        if tentativas_invalidas >= 3:
+            return None
+
+def atualizar_produtos_em_lote():
+    """
+    Função para reajustar o preço ou o estoque de vários produtos de uma vez
+    Os produtos são escolhidos por categoria, faixa de preço, estoque baixo ou arquivo de IDs
+    O lote inteiro é validado antes: se algum produto ficar inválido, nada é alterado
+    """
+    print("\n===ATUALIZAÇÃO EM LOTE===")
+    if not executar_operacao('contar'):
+        print("\nNenhum produto cadastrado.")
+        return
+
+    print("Quais produtos você deseja atualizar?")
+    print("1. Por Categoria")
+    print("2. Por Faixa de Preço")
+    print("3. Produtos com Estoque Baixo")
+    print("4. Lista de IDs em arquivo (um ID por linha)")
+    opcao_filtro = solicitar_opcao("Digite a opção: ", 4)
+    if opcao_filtro is None:
+        print("Muitas tentativas inválidas. Cancelando atualização em lote.")
+        return
+
+    try:
+        if opcao_filtro == 1:
+            print(f"Categorias disponíveis: {', '.join(categorias_validas)}")
+            categoria = input("Digite a categoria: ").strip().capitalize()
+            if categoria not in categorias_validas:
+                print("Erro: Categoria inválida.")
+                return
+            filtro = {'categoria': categoria}
+        elif opcao_filtro == 2:
+            preco_minimo = converter_para_centavos(input("Digite o preço mínimo: R$ "))
+            preco_maximo = converter_para_centavos(input("Digite o preço máximo: R$ "))
+            filtro = {'preco_minimo': preco_minimo, 'preco_maximo': preco_maximo}
+        elif opcao_filtro == 3:
+            filtro = {'estoque_baixo': True}
+        else:
+            caminho = input("Digite o caminho do arquivo de IDs: ").strip()
+            filtro = {'ids': carregar_ids_de_arquivo(caminho)}
+        selecionados = executar_operacao('contar_selecionados', filtro)
+    except ValueError as erro:
+        print(f"Erro: {erro}")
+        return
+    except OSError as erro:
+        print(f"Erro ao ler o arquivo: {erro}")
+        return
+
+    if not selecionados:
+        print("\nNenhum produto encontrado para esse filtro.")
+        return
+    print(f"\n{selecionados} produto(s) selecionado(s).")
+
+    print("O que você deseja alterar?")
+    print("1. Preço por percentual (ex.: 10 aumenta 10%, -5 reduz 5%)")
+    print("2. Preço por valor fixo (ex.: 2,50 ou -1,00)")
+    print("3. Estoque (ex.: +5 ou -3)")
+    ajuste = solicitar_opcao("Digite a opção: ", 3)
+    if ajuste is None:
+        print("Muitas tentativas inválidas. Cancelando atualização em lote.")
+        return
+
+    try:
+        if ajuste == 1:
+            percentual = input("Digite o percentual (até duas casas decimais): ").strip()
+            converter_percentual_em_centesimos(percentual)  # valida antes da confirmação
+            executar = lambda: executar_operacao('lote_precos', filtro, percentual, None)
+        elif ajuste == 2:
+            valor_fixo = converter_para_centavos(input("Digite o valor: R$ "))
+            executar = lambda: executar_operacao('lote_precos', filtro, None, valor_fixo)
+        else:
+            variacao = int(input("Digite a variação de estoque: "))
+            local = solicitar_local("Digite o local do estoque: ")
+            if local is None:
+                print("Muitas tentativas inválidas. Cancelando atualização em lote.")
+                return
+            executar = lambda: executar_operacao('lote_estoque', filtro, variacao, local)
+    except ValueError:
+        print("Erro: Valor inválido.")
+        return
+
+    confirmacao = input(f"Confirma a alteração de {selecionados} produto(s)? (S/N) ").upper()
+    if confirmacao != "S":
+        print("\nAtualização em lote cancelada\n")
+        return
+    try:
+        alterados = executar()
+    except ValueError as erro:
+        print(f"\nErro: {erro}. Nenhum produto foi alterado.\n")
+        return
+    print(f"\n{alterados} produto(s) atualizado(s) com sucesso!\n")
 
 #Ínicio do código para saída do menu
-while True:
-    # Exibe o menu principal para o usuário
-    exibir_menu()
-    input_menu = input("Selecione uma opção do menu: ")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sistema de Gerenciamento de Produtos")
+    parser.add_argument('--particionado', choices=['categoria', 'hash'],
+                        help="divide o catálogo entre processos trabalhadores (modo particionado)")
+    parser.add_argument('--particoes', type=int,
+                        help="quantidade de partições no critério 'hash' (padrão: número de núcleos)")
+    argumentos = parser.parse_args()
+
+    print("========================================================")
+    print("Bem-vindo ao Sistema de Gerenciamento de Produtos!")
+    print("========================================================\n")
+
+    if carregar_estado():
+        print(f"{len(lista_produtos)} produto(s) carregado(s) de '{DIRETORIO_DADOS}'.\n")
+    if argumentos.particionado:
+        iniciar_modo_particionado(argumentos.particionado, argumentos.particoes)
+        print(f"Modo particionado ativo: {len(particoes)} partições (critério '{argumentos.particionado}').\n")
+
+    while True:
+        # Exibe o menu principal para o usuário
+        exibir_menu()
+        input_menu = input("Selecione uma opção do menu: ")
     
-    # Tratamento de entrada do usuário com validação de erro
-    try:
-        # Converte a entrada para número inteiro
-        opcao = int(input_menu)
+        # Tratamento de entrada do usuário com validação de erro
+        try:
+            # Converte a entrada para número inteiro
+            opcao = int(input_menu)
         
-        # Executa a função correspondente à opção escolhida
-        if opcao == 1:
-            cadastrar_novo_produto()  # Chama função de cadastro
-        elif opcao == 2:
-            atualizar_informacoes_produto()  # Chama função de atualização
-        elif opcao == 3:
-            excluir_produto_do_sistema()  # Chama função de exclusão
-        elif opcao == 4:
-            exibir_lista_de_produtos()  # Chama função de listagem
-        elif opcao == 5:
-            ordenar_produtos_por_criterio()  # Chama função de ordenação
-        elif opcao == 6:
-            buscar_produto_no_sistema()  # Chama função de busca
-        elif opcao == 7:
-            gerar_relatorios_do_sistema()  # Chama função de relatórios
-        elif opcao == 8:
-            processar_venda_de_produto()  # Chama função de venda
-        elif opcao == 9:
-            aplicar_desconto_em_produto()  # Chama função de desconto
-        elif opcao == 10:
-            visualizar_historico_de_vendas()
-        elif opcao == 11:
-            # Opção para sair do sistema
-            print("Saindo do sistema. Até Logo!")
-            break  # Encerra o loop principal
-        else:
-            # Trata opções inválidas (números fora do range)
-            print("Opção inválida! Por favor, escolha uma opção de 1 a 11.")
+            # Executa a função correspondente à opção escolhida
+            if opcao == 1:
+                cadastrar_novo_produto()  # Chama função de cadastro
+            elif opcao == 2:
+                atualizar_informacoes_produto()  # Chama função de atualização
+            elif opcao == 3:
+                excluir_produto_do_sistema()  # Chama função de exclusão
+            elif opcao == 4:
+                exibir_lista_de_produtos()  # Chama função de listagem
+            elif opcao == 5:
+                ordenar_produtos_por_criterio()  # Chama função de ordenação
+            elif opcao == 6:
+                buscar_produto_no_sistema()  # Chama função de busca
+            elif opcao == 7:
+                gerar_relatorios_do_sistema()  # Chama função de relatórios
+            elif opcao == 8:
+                processar_venda_de_produto()  # Chama função de venda
+            elif opcao == 9:
+                aplicar_desconto_em_produto()  # Chama função de desconto
+            elif opcao == 10:
+                visualizar_historico_de_vendas()
+            elif opcao == 11:
+                exportar_dados_do_sistema()  # Chama função de exportação
+            elif opcao == 12:
+                transferir_estoque_entre_locais()  # Chama função de transferência
+            elif opcao == 13:
+                atualizar_produtos_em_lote()  # Chama função de atualização em lote
+            elif opcao == 14:
+                # Opção para sair do sistema
+                if particoes:
+                    encerrar_modo_particionado()
+                quantidade_salva = salvar_estado()
+                print(f"{quantidade_salva} produto(s) salvo(s) em '{DIRETORIO_DADOS}'.")
+                print("Saindo do sistema. Até Logo!")
+                break  # Encerra o loop principal
+            else:
+                # Trata opções inválidas (números fora do range)
+                print("Opção inválida! Por favor, escolha uma opção de 1 a 14.")
             
-    except ValueError:
-        # Trata entradas não numéricas (letras, símbolos, etc.)
-        print("Erro: Por favor, digite apenas números de 1 a 11.")
+        except ValueError:
+            # Trata entradas não numéricas (letras, símbolos, etc.)
+            print("Erro: Por favor, digite apenas números de 1 a 14.")